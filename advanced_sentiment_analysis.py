@@ -4,6 +4,11 @@ from collections import Counter
 import re
 import os
 
+from columnar_store import load_frame, write_frame
+from dhaka_gazetteer import AREA_LABELS, dhaka_matcher
+from pattern_scorer import sentiment_frame
+from post_store import PostStore, post_row
+
 print("=" * 100)
 print("ADVANCED SENTIMENT ANALYSIS WITH TOPIC EXTRACTION")
 print("=" * 100)
@@ -15,8 +20,8 @@ output_dir = "advanced_sentiment_analysis"
 os.makedirs(output_dir, exist_ok=True)
 
 # Load data
-print("📂 Loading CSV file...")
-df = pd.read_csv(csv_file)
+print("📂 Loading dataset...")
+df = load_frame(csv_file)
 df['body'] = df['body'].fillna('')
 df['title'] = df['title'].fillna('')
 print(f"✓ Loaded {len(df)} posts\n")
@@ -25,38 +30,9 @@ print(f"✓ Loaded {len(df)} posts\n")
 print("🔍 ADVANCED SENTIMENT ANALYSIS")
 print("-" * 100)
 
-from textblob import TextBlob
-
-def advanced_sentiment(text):
-    """Analyze sentiment with subjectivity"""
-    if not text or pd.isna(text):
-        return 0, 0, 'neutral'
-    
-    try:
-        blob = TextBlob(str(text))
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
-        
-        if polarity > 0.1:
-            sentiment = 'positive'
-        elif polarity < -0.1:
-            sentiment = 'negative'
-        else:
-            sentiment = 'neutral'
-        
-        return polarity, subjectivity, sentiment
-    except:
-        return 0, 0, 'neutral'
-
 print("Analyzing sentiment and subjectivity...")
-results = []
-for idx, text in enumerate(df['body']):
-    if idx % 50 == 0:
-        print(f"  Processing: {idx}/{len(df)} posts...", end='\r')
-    polarity, subjectivity, sentiment = advanced_sentiment(text)
-    results.append({'polarity': polarity, 'subjectivity': subjectivity, 'sentiment': sentiment})
-
-sentiment_df = pd.DataFrame(results)
+# TextBlob polarity/subjectivity for the whole column in one vectorised pass
+sentiment_df = sentiment_frame(df['body'])
 df['polarity'] = sentiment_df['polarity']
 df['subjectivity'] = sentiment_df['subjectivity']
 df['sentiment'] = sentiment_df['sentiment']
@@ -278,7 +254,28 @@ df_output = df[[
 ]].copy()
 df_output['topics'] = df['topics'].apply(lambda x: ', '.join(x))
 df_output.to_csv(os.path.join(output_dir, "05_posts_with_advanced_analysis.csv"), index=False)
-print(f"✓ Saved full dataset to {output_dir}/05_posts_with_advanced_analysis.csv\n")
+# Typed Parquet copy for the downstream analysis scripts
+write_frame(df_output, os.path.join(output_dir, "05_posts_with_advanced_analysis.csv"))
+print(f"✓ Saved full dataset to {output_dir}/05_posts_with_advanced_analysis.csv (+ .parquet)\n")
+
+# ===== 11b. UPDATE POST STORE =====
+# Posts and their analysis go into the shared store, where reports can query them by
+# sentiment, topic, area and date instead of re-reading this CSV
+store = PostStore()
+store_columns = ['title', 'body', 'url', 'author', 'upvotes', 'comments', 'date', 'subreddit', 'permalink']
+records = df[[column for column in store_columns if column in df.columns]].to_dict('records')
+stored = store.upsert_posts(records)
+for record, (_, row) in zip(records, df.iterrows()):
+    key = post_row(record)
+    if key is None:
+        continue
+    store.upsert_analysis(
+        key['post_id'], row['polarity'], row['subjectivity'], row['sentiment'], row['emotion'],
+        topics=row['topics'],
+        areas=dhaka_matcher.labels(f"{row['title']} {row['body']}", only=AREA_LABELS)
+    )
+store.close()
+print(f"✓ Upserted {stored} of {len(records)} posts with analysis into the post store\n")
 
 # ===== 12. SUMMARY REPORT =====
 print("=" * 100)
@@ -1,16 +1,22 @@
 import pandas as pd
-from textblob import TextBlob
 from collections import Counter
 import os
 
+from columnar_store import load_frame
+from pattern_scorer import sentiment_frame
+
 print("=" * 100)
 print("SENTIMENT ANALYSIS - GENERAL BANGLADESH POSTS (Non-Dhaka Focused)")
 print("=" * 100)
 print()
 
 # Load original data
-df_all = pd.read_csv("advanced_sentiment_analysis/05_posts_with_advanced_analysis.csv")
-df_dhaka = pd.read_csv("advanced_sentiment_analysis/05_posts_dhaka_only.csv")
+# Non-Dhaka sentiment, emotion and topics are recomputed from titles below,
+# so only the columns used for the comparison are loaded
+df_all = load_frame("advanced_sentiment_analysis/05_posts_with_advanced_analysis.csv",
+                    columns=['title', 'author', 'upvotes', 'comments', 'date', 'subreddit', 'polarity', 'sentiment'])
+df_dhaka = load_frame("advanced_sentiment_analysis/05_posts_dhaka_only.csv",
+                      columns=['title', 'upvotes', 'polarity', 'sentiment'])
 
 # Get non-Dhaka posts
 dhaka_titles = set(df_dhaka['title'].values)
@@ -21,22 +27,6 @@ print(f"From r/bangladesh and r/dhaka subreddits")
 print(f"Date Range: Last 3 months")
 print()
 
-# ===== SENTIMENT ANALYSIS =====
-def advanced_sentiment(text):
-    """Calculate sentiment with polarity and subjectivity"""
-    blob = TextBlob(str(text))
-    polarity = blob.sentiment.polarity
-    subjectivity = blob.sentiment.subjectivity
-    
-    if polarity > 0.1:
-        sentiment = 'positive'
-    elif polarity < -0.1:
-        sentiment = 'negative'
-    else:
-        sentiment = 'neutral'
-    
-    return polarity, subjectivity, sentiment
-
 # ===== EMOTION DETECTION =====
 emotion_keywords = {
     'joy': ['good', 'great', 'love', 'happy', 'excellent', 'amazing', 'awesome', 'wonderful', 
@@ -99,26 +89,11 @@ def categorize_topics(text):
 
 # Apply analysis
 print("🔍 Analyzing sentiment...")
-df_non_dhaka['polarity'] = 0.0
-df_non_dhaka['subjectivity'] = 0.0
-df_non_dhaka['sentiment'] = ''
-df_non_dhaka['emotion'] = ''
-df_non_dhaka['topics'] = ''
-
-for idx, row in df_non_dhaka.iterrows():
-    if (idx - df_non_dhaka.index[0]) % 30 == 0:
-        print(f"   Processing... {idx - df_non_dhaka.index[0]}/{len(df_non_dhaka)}")
-    
-    title = str(row['title'])
-    polarity, subjectivity, sentiment = advanced_sentiment(title)
-    emotion = detect_emotion(title)
-    topics = categorize_topics(title)
-    
-    df_non_dhaka.at[idx, 'polarity'] = polarity
-    df_non_dhaka.at[idx, 'subjectivity'] = subjectivity
-    df_non_dhaka.at[idx, 'sentiment'] = sentiment
-    df_non_dhaka.at[idx, 'emotion'] = emotion
-    df_non_dhaka.at[idx, 'topics'] = topics
+titles = df_non_dhaka['title'].astype(str)
+# TextBlob polarity/subjectivity for all titles in one vectorised pass
+df_non_dhaka[['polarity', 'subjectivity', 'sentiment']] = sentiment_frame(titles)
+df_non_dhaka['emotion'] = titles.apply(detect_emotion)
+df_non_dhaka['topics'] = titles.apply(categorize_topics)
 
 print(f"✓ Analysis complete!")
 print()
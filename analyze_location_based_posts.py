@@ -1,9 +1,10 @@
 import pandas as pd
-from textblob import TextBlob
 from collections import Counter
 import re
 import os
 
+from pattern_scorer import sentiment_frame
+
 print("=" * 100)
 print("SENTIMENT ANALYSIS - POSTS FROM DHAKA USERS (LOCATION-BASED)")
 print("=" * 100)
@@ -16,22 +17,6 @@ print(f"📊 Dataset: {len(df)} posts from Dhaka-located users")
 print(f"Date Range: Last 3 months")
 print()
 
-# ===== SENTIMENT ANALYSIS =====
-def advanced_sentiment(text):
-    """Calculate sentiment with polarity and subjectivity"""
-    blob = TextBlob(str(text))
-    polarity = blob.sentiment.polarity
-    subjectivity = blob.sentiment.subjectivity
-    
-    if polarity > 0.1:
-        sentiment = 'positive'
-    elif polarity < -0.1:
-        sentiment = 'negative'
-    else:
-        sentiment = 'neutral'
-    
-    return polarity, subjectivity, sentiment
-
 # ===== EMOTION DETECTION =====
 emotion_keywords = {
     'joy': ['good', 'great', 'love', 'happy', 'excellent', 'amazing', 'awesome', 'wonderful', 
@@ -94,26 +79,11 @@ def categorize_topics(text):
 
 # Apply analysis
 print("🔍 Analyzing sentiment...")
-df['polarity'] = 0.0
-df['subjectivity'] = 0.0
-df['sentiment'] = ''
-df['emotion'] = ''
-df['topics'] = ''
-
-for idx, row in df.iterrows():
-    if idx % 50 == 0:
-        print(f"   Processing... {idx}/{len(df)}")
-    
-    title = str(row['title'])
-    polarity, subjectivity, sentiment = advanced_sentiment(title)
-    emotion = detect_emotion(title)
-    topics = categorize_topics(title)
-    
-    df.at[idx, 'polarity'] = polarity
-    df.at[idx, 'subjectivity'] = subjectivity
-    df.at[idx, 'sentiment'] = sentiment
-    df.at[idx, 'emotion'] = emotion
-    df.at[idx, 'topics'] = topics
+titles = df['title'].astype(str)
+# TextBlob polarity/subjectivity for all titles in one vectorised pass
+df[['polarity', 'subjectivity', 'sentiment']] = sentiment_frame(titles)
+df['emotion'] = titles.apply(detect_emotion)
+df['topics'] = titles.apply(categorize_topics)
 
 print(f"✓ Analysis complete!")
 print()
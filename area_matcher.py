@@ -0,0 +1,137 @@
+import unicodedata
+from collections import deque, namedtuple
+
+# ------------------------------
+# Aho–Corasick gazetteer matcher: every place name found in one pass over the text
+# ------------------------------
+Match = namedtuple('Match', ['label', 'start', 'end'])
+
+SEPARATORS = {'-', '_', '/'}
+
+
+def _canonical_char(c):
+    """Lowercase; spaces, hyphens and underscores all become one space"""
+    if c.isspace() or c in SEPARATORS:
+        return ' '
+    lower = c.lower()
+    return lower if len(lower) == 1 else c
+
+
+def canonical_form(text):
+    """Spelling as the automaton sees it: 'Kawran-Bazar' -> 'kawran bazar'"""
+    out = []
+    for c in unicodedata.normalize('NFC', text.strip()):
+        c = _canonical_char(c)
+        if c == ' ' and out and out[-1] == ' ':
+            continue
+        out.append(c)
+    return ''.join(out)
+
+
+def _is_word_char(c):
+    # Bengali vowel signs are combining marks, not alphanumerics
+    return c.isalnum() or c == '_' or unicodedata.category(c).startswith('M')
+
+
+def _is_bengali(c):
+    return 'ঀ' <= c <= '৿'
+
+
+class GazetteerMatcher:
+    """Compiled multi-pattern matcher over {label: [spelling, ...]}
+
+    Matching is case-insensitive, treats hyphens/underscores/runs of whitespace as a
+    single space and only accepts matches on word boundaries. Bengali spellings only
+    need a boundary on the left, since case suffixes attach to the name (ঢাকায়).
+    The cost of a scan depends on the text length, not on the number of spellings.
+    """
+
+    def __init__(self, spellings):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        self.patterns = []      # (label, canonical length, needs right boundary)
+
+        for label, variants in spellings.items():
+            for variant in variants:
+                form = canonical_form(variant)
+                if form:
+                    self._add(label, form)
+        self._build_links()
+
+    def _add(self, label, form):
+        state = 0
+        for c in form:
+            nxt = self.goto[state].get(c)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][c] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = nxt
+        self.output[state].append(len(self.patterns))
+        self.patterns.append((label, len(form), not _is_bengali(form[-1])))
+
+    def _build_links(self):
+        """Breadth-first failure links; outputs are merged along them"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and c not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(c, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find(self, text, overlapping=False):
+        """Matches in text order; by default the leftmost-longest non-overlapping ones"""
+        if not isinstance(text, str) or not text:
+            return []
+
+        matches = []
+        positions = []      # original index of every character fed to the automaton
+        state = 0
+        previous = ' '
+        for i, raw in enumerate(text):
+            c = _canonical_char(raw)
+            if c == ' ' and previous == ' ':
+                continue
+            previous = c
+            positions.append(i)
+
+            while state and c not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(c, 0)
+
+            for pattern_id in self.output[state]:
+                label, length, right_boundary = self.patterns[pattern_id]
+                start = positions[len(positions) - length]
+                end = i + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                # A trailing number is still a boundary: Gulshan2, Mirpur10
+                if right_boundary and end < len(text) and _is_word_char(text[end]) and not text[end].isdigit():
+                    continue
+                matches.append(Match(label, start, end))
+
+        if overlapping:
+            return sorted(matches, key=lambda m: (m.start, -m.end))
+
+        selected = []
+        last_end = -1
+        for match in sorted(matches, key=lambda m: (m.start, -m.end)):
+            if match.start >= last_end:
+                selected.append(match)
+                last_end = match.end
+        return selected
+
+    def labels(self, text, only=None):
+        """Distinct matched labels in order of first mention, optionally restricted to `only`"""
+        found = []
+        for match in self.find(text):
+            if match.label not in found and (only is None or match.label in only):
+                found.append(match.label)
+        return found
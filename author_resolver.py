@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+
+import aiohttp
+
+import reddit_client
+from reddit_client import RedditClient, RedditHTTPError
+
+# ------------------------------
+# Bulk author-profile resolver with a persistent per-author cache
+# ------------------------------
+CACHE_FILE = "author_cache/authors.sqlite3"
+SKIP_AUTHORS = {None, '', '[deleted]', 'AutoModerator'}
+
+
+class AuthorCache:
+    """SQLite cache of /user/{name}/about profiles, including negative results
+
+    Found profiles are kept for `ttl` seconds. Deleted and suspended accounts are
+    cached as well ('missing' / 'suspended') for `negative_ttl`, so they are not
+    requested again on every run.
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl=7 * 24 * 3600, negative_ttl=30 * 24 * 3600):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.db = sqlite3.connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS authors (
+                name TEXT PRIMARY KEY,
+                status TEXT,
+                profile TEXT,
+                fetched_at REAL
+            )
+        """)
+        self.db.commit()
+
+    def get_many(self, names):
+        """{name: (status, profile)} for every name with a fresh cache entry"""
+        now = time.time()
+        found = {}
+        names = list(names)
+        for i in range(0, len(names), 500):
+            batch = names[i:i + 500]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.db.execute(
+                f"SELECT name, status, profile, fetched_at FROM authors WHERE name IN ({placeholders})", batch
+            ).fetchall()
+            for name, status, profile, fetched_at in rows:
+                ttl = self.ttl if status == 'ok' else self.negative_ttl
+                if now - fetched_at < ttl:
+                    found[name] = (status, json.loads(profile) if profile else None)
+        return found
+
+    def put(self, name, status, profile=None):
+        self.db.execute(
+            "INSERT OR REPLACE INTO authors VALUES (?, ?, ?, ?)",
+            (name, status, json.dumps(profile, ensure_ascii=False) if profile else None, time.time())
+        )
+
+    def commit(self):
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+def profile_fields(data):
+    """The profile metadata we keep from /user/{name}/about"""
+    profile_sub = data.get('subreddit') or {}
+    return {
+        'created_utc': data.get('created_utc'),
+        'link_karma': data.get('link_karma'),
+        'comment_karma': data.get('comment_karma'),
+        'total_karma': data.get('total_karma'),
+        'verified': data.get('verified'),
+        'has_verified_email': data.get('has_verified_email'),
+        'is_mod': data.get('is_mod'),
+        'description': profile_sub.get('public_description', '')
+    }
+
+
+async def fetch_author(client, name):
+    """(status, profile) for one author"""
+    try:
+        data = await client.get_json(f"{reddit_client.REDDIT_BASE}/user/{name}/about/.json")
+    except RedditHTTPError as e:
+        if e.status == 404:
+            return 'missing', None
+        # A 403 may be a blocked or throttled client rather than the account; suspended
+        # accounts come back as is_suspended in a 200, so 403s are left uncached
+        raise
+    data = data.get('data', {})
+    if data.get('is_suspended'):
+        return 'suspended', None
+    return 'ok', profile_fields(data)
+
+
+async def resolve_authors_async(client, names, cache):
+    """{name: profile or None}, one request per unique author not already cached"""
+    unique = {name for name in names if name not in SKIP_AUTHORS and isinstance(name, str)}
+    cached = cache.get_many(unique)
+    to_fetch = sorted(unique - set(cached))
+    print(f"👤 {len(unique)} unique authors: {len(cached)} cached, {len(to_fetch)} to fetch")
+
+    results = {name: profile for name, (status, profile) in cached.items()}
+
+    async def run_author(name):
+        try:
+            status, profile = await fetch_author(client, name)
+        except (aiohttp.ClientError, asyncio.TimeoutError, RedditHTTPError) as e:
+            # Transient failures are not cached; the next run tries again
+            print(f"   Error on u/{name}: {e}")
+            results[name] = None
+            return
+        cache.put(name, status, profile)
+        results[name] = profile
+
+    await asyncio.gather(*(run_author(name) for name in to_fetch))
+    cache.commit()
+    return results
+
+
+def resolve_authors(names, cache_path=CACHE_FILE, **client_kwargs):
+    """Blocking entry point"""
+
+    async def run():
+        cache = AuthorCache(cache_path)
+        try:
+            async with RedditClient(**client_kwargs) as client:
+                return await resolve_authors_async(client, names, cache)
+        finally:
+            cache.close()
+
+    return asyncio.run(run())
+
+
+def enrich_posts(posts, profiles):
+    """Add author_* profile columns to post dicts in place"""
+    for post in posts:
+        profile = profiles.get(post.get('author'))
+        for field in ('created_utc', 'link_karma', 'comment_karma', 'total_karma', 'verified', 'description'):
+            post[f'author_{field}'] = profile.get(field) if profile else None
+    return posts
@@ -1,5 +1,5 @@
-import pandas as pd
-import re
+from columnar_store import load_frame, write_frame
+from dhaka_gazetteer import dhaka_matcher
 
 print("=" * 100)
 print("CHECKING: ARE THESE POSTS ACTUALLY ABOUT DHAKA?")
@@ -7,7 +7,7 @@ print("=" * 100)
 print()
 
 # Load data
-df = pd.read_csv("advanced_sentiment_analysis/05_posts_with_advanced_analysis.csv")
+df = load_frame("advanced_sentiment_analysis/05_posts_with_advanced_analysis.csv")
 
 print(f"Total Posts in Dataset: {len(df)}")
 print(f"Subreddits: r/bangladesh, r/dhaka")
@@ -32,22 +32,13 @@ print("=" * 100)
 print("🔍 CHECKING DHAKA MENTIONS IN POST TITLES")
 print("-" * 100)
 
-dhaka_keywords = ['dhaka', 'বাঙ্গালাদেশ', 'बangladesh', 'bd', 'bengal', 'bangladesh']
+# Dhaka / Bangladesh in English or Bengali (dhaka, ঢাকা, bd, bangladesh, বাংলাদেশ, ...),
+# matched on word boundaries by the shared gazetteer in one pass per title
+relevance_labels = {'Dhaka', 'Old Dhaka', 'DNCC', 'DSCC', 'Bangladesh'}
+mentions_dhaka = df['title'].map(lambda t: bool(dhaka_matcher.labels(t, only=relevance_labels)))
 
-dhaka_related = 0
-not_dhaka = []
-
-for idx, row in df.iterrows():
-    title = str(row['title']).lower()
-    subreddit = str(row['subreddit']).lower()
-    
-    has_dhaka = any(keyword in title for keyword in dhaka_keywords)
-    
-    if has_dhaka:
-        dhaka_related += 1
-    else:
-        if len(not_dhaka) < 20:  # Collect first 20 non-dhaka posts
-            not_dhaka.append((row['title'], row['subreddit']))
+dhaka_related = int(mentions_dhaka.sum())
+not_dhaka = list(df.loc[~mentions_dhaka, ['title', 'subreddit']].head(20).itertuples(index=False, name=None))
 
 print(f"\nPosts mentioning Dhaka/Bangladesh in title: {dhaka_related} ({dhaka_related/len(df)*100:.1f}%)")
 print(f"Posts NOT mentioning Dhaka/Bangladesh: {len(df) - dhaka_related} ({(len(df)-dhaka_related)/len(df)*100:.1f}%)")
@@ -69,7 +60,7 @@ print("=" * 100)
 print("🏷️  WHAT ARE THESE NON-DHAKA POSTS ABOUT?")
 print("-" * 100)
 
-non_dhaka_df = df[~df['title'].str.lower().str.contains('|'.join(dhaka_keywords), regex=True, na=False)]
+non_dhaka_df = df[~mentions_dhaka]
 
 print(f"\nTotal Non-Dhaka Posts: {len(non_dhaka_df)}")
 print()
@@ -123,13 +114,14 @@ print("=" * 100)
 print("✂️  CREATING FILTERED DATASET - DHAKA ONLY")
 print("=" * 100)
 
-dhaka_only = df[df['title'].str.lower().str.contains('|'.join(dhaka_keywords), regex=True, na=False)]
+dhaka_only = df[mentions_dhaka]
 
 print(f"\nFiltered Dataset: {len(dhaka_only)} posts (from {len(df)})")
 print(f"Posts removed: {len(df) - len(dhaka_only)}")
 
 # Save filtered version
 dhaka_only.to_csv("advanced_sentiment_analysis/05_posts_dhaka_only.csv", index=False, encoding='utf-8')
+write_frame(dhaka_only, "advanced_sentiment_analysis/05_posts_dhaka_only.csv")
 print(f"✓ Saved filtered data to: advanced_sentiment_analysis/05_posts_dhaka_only.csv")
 
 print()
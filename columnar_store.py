@@ -0,0 +1,88 @@
+import json
+import os
+
+import pandas as pd
+
+# ------------------------------
+# Typed, compressed Parquet hand-offs between the crawl and analysis stages
+# ------------------------------
+CATEGORICAL_COLUMNS = ['subreddit', 'sentiment', 'emotion', 'title_sentiment', 'body_sentiment',
+                       'combined_sentiment', 'zone', 'thana', 'primary_area']
+TIMESTAMP_COLUMNS = ['date', 'created']
+EPOCH_COLUMNS = ['created_utc']
+INTEGER_COLUMNS = ['upvotes', 'comments', 'score', 'num_comments']
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet storage needs the 'pyarrow' package (pip install pyarrow)")
+    return pyarrow
+
+
+def parquet_path(path):
+    """Parquet file that stands in for a CSV/JSON path: x/posts.csv -> x/posts.parquet"""
+    return os.path.splitext(path)[0] + '.parquet'
+
+
+def typed_frame(df):
+    """Categoricals for low-cardinality labels, timestamps for dates, integers for counts"""
+    df = df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+    for column in EPOCH_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(pd.to_numeric(df[column], errors='coerce'), unit='s')
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            values = pd.to_numeric(df[column], errors='coerce')
+            df[column] = values.astype('Int64' if values.isna().any() else 'int64')
+    return df
+
+
+def write_frame(df, path, compression='zstd'):
+    """Write df as typed Parquet next to `path`; returns the Parquet path"""
+    require_pyarrow()
+    target = parquet_path(path)
+    directory = os.path.dirname(target)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    typed_frame(df).to_parquet(target, engine='pyarrow', compression=compression, index=False)
+    return target
+
+
+def read_frame(path, columns=None, filters=None):
+    """Read only `columns` (and row groups passing `filters`) from the Parquet version of path"""
+    return pd.read_parquet(parquet_path(path), engine='pyarrow', columns=columns, filters=filters)
+
+
+def _read_source(path):
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return pd.DataFrame(json.load(f))
+    return pd.read_csv(path)
+
+
+def load_frame(path, columns=None):
+    """Load a dataset by its usual CSV/JSON name, preferring the Parquet copy
+
+    When the Parquet file is missing or older than the source it is rebuilt from
+    the source first (if pyarrow is installed), so later runs only decode the
+    requested columns.
+    """
+    target = parquet_path(path)
+    if os.path.exists(target) and (not os.path.exists(path) or os.path.getmtime(target) >= os.path.getmtime(path)):
+        return read_frame(path, columns)
+
+    df = _read_source(path)
+    try:
+        write_frame(df, path)
+    except ImportError:
+        df = typed_frame(df)
+        return df[columns] if columns else df
+    return read_frame(path, columns)
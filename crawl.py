@@ -1,8 +1,13 @@
-import requests
 import pandas as pd
 from datetime import datetime, timedelta
 import json
-import time
+
+from crawl_state import HighWaterMarks
+from jsonl_sink import JsonlSink, read_sink
+from post_store import PostStore
+from reddit_client import crawl_listings, search_job
+from response_cache import ResponseCache
+from search_partition import crawl_time_sliced
 
 # ------------------------------
 # Configuration
@@ -12,6 +17,10 @@ subreddits = ["bangladesh", "dhaka"]               # Multiple subreddits
 max_posts_total = 2000                             # Total posts to collect
 max_posts_per_subreddit = 500                      # Posts per subreddit
 date_range_days = 365                              # Search last N days (None for all time)
+incremental = False                                # Only fetch posts newer than the previous run
+marks_file = "checkpoints/crawl_marks.json"        # High-water marks used by incremental mode
+cache_ttl_hours = 6                                # Serve repeated pages from http_cache/ (0 disables)
+sink_compression = None                            # None, 'gzip' or 'zstd' for the JSONL output
 
 # Set up headers for Reddit API
 headers = {
@@ -21,7 +30,12 @@ headers = {
 # ------------------------------
 # Collect Posts
 # ------------------------------
-all_posts = []
+# Posts are streamed to JSONL as they arrive instead of being held in memory
+run_name = f"dhaka_posts_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+sink = JsonlSink(f"crawl_output/{run_name}", compression=sink_compression)
+# ...and upserted into the shared post store, so repeat sightings refresh upvotes/comments
+store = PostStore()
+run_id = store.start_run(run_name)
 posts_collected = 0
 
 # Calculate date range
@@ -32,89 +46,86 @@ print(f"Searching for '{query}' in subreddits: {', '.join(subreddits)}")
 print(f"Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
 print(f"Target: {max_posts_total} posts total\n")
 
-for subreddit in subreddits:
-    if posts_collected >= max_posts_total:
-        break
-    
-    print(f"Scraping r/{subreddit}...")
-    after = None
-    subreddit_posts = 0
+subreddit_counts = {subreddit: 0 for subreddit in subreddits}
+
+def handle_page(job, children):
+    """Collect one page of search results; returning False stops this subreddit"""
+    global posts_collected
+    subreddit = job.key[0]
+    kept = []
     
-    while subreddit_posts < max_posts_per_subreddit and posts_collected < max_posts_total:
-        # Construct URL for Reddit search
-        url = f"https://www.reddit.com/r/{subreddit}/search.json"
-        params = {
-            'q': query,
-            'restrict_sr': 'on',
-            'sort': 'new',
-            'limit': '100'
-        }
+    for post_data in children:
+        if subreddit_counts[subreddit] >= max_posts_per_subreddit or posts_collected >= max_posts_total:
+            break
         
-        if after:
-            params['after'] = after
+        post = post_data.get('data', {})
+        post_timestamp = post.get('created_utc', 0)
+        post_date = datetime.fromtimestamp(post_timestamp)
         
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            children = data.get('data', {}).get('children', [])
-            
-            if not children:
-                print(f"  No more posts found in r/{subreddit}")
-                break
-            
-            for post_data in children:
-                if subreddit_posts >= max_posts_per_subreddit or posts_collected >= max_posts_total:
-                    break
-                
-                post = post_data.get('data', {})
-                post_timestamp = post.get('created_utc', 0)
-                post_date = datetime.fromtimestamp(post_timestamp)
-                
-                # Filter by date range
-                if post_date < start_date or post_date > end_date:
-                    continue
-                
-                all_posts.append([
-                    post.get('title', ''),
-                    post.get('selftext', ''),
-                    post.get('url', ''),
-                    post.get('author', '[deleted]'),
-                    post.get('score', 0),
-                    post.get('num_comments', 0),
-                    post_date,
-                    subreddit  # Track which subreddit the post came from
-                ])
-                subreddit_posts += 1
-                posts_collected += 1
-            
-            # Get the 'after' token for pagination
-            after = data.get('data', {}).get('after')
-            if not after:
-                print(f"  Reached end of r/{subreddit} (collected {subreddit_posts} posts)")
-                break
-            
-            # Add delay to avoid rate limiting
-            time.sleep(1)
-                
-        except Exception as e:
-            print(f"  Error fetching posts from r/{subreddit}: {e}")
-            break
+        # Filter by date range
+        if post_date < start_date or post_date > end_date:
+            continue
+        
+        sink.write({
+            'title': post.get('title', ''),
+            'body': post.get('selftext', ''),
+            'url': post.get('url', ''),
+            'author': post.get('author', '[deleted]'),
+            'upvotes': post.get('score', 0),
+            'comments': post.get('num_comments', 0),
+            'date': post_date.strftime("%Y-%m-%d %H:%M:%S"),
+            'subreddit': subreddit,  # Track which subreddit the post came from
+            'fullname': post.get('name'),
+            'permalink': f"https://www.reddit.com{post.get('permalink', '')}",
+            'crosspost_parent': post.get('crosspost_parent')
+        })
+        kept.append(post)
+        subreddit_counts[subreddit] += 1
+        posts_collected += 1
     
-    print(f"  Collected {subreddit_posts} posts from r/{subreddit} (total: {posts_collected})\n")
+    sink.flush()
+    store.upsert_posts(kept)
+    return subreddit_counts[subreddit] < max_posts_per_subreddit and posts_collected < max_posts_total
+
+high_water = HighWaterMarks(marks_file) if incremental else None
+# Incremental runs always need the live first page, so they bypass the cache
+cache = ResponseCache(ttl=cache_ttl_hours * 3600) if cache_ttl_hours and not incremental else None
+
+if date_range_days and not incremental:
+    # Slice the date window so busy queries get past the ~1000-result search cap;
+    # all slices of all subreddits are crawled in parallel under the shared rate limiter
+    crawl_time_sliced([(subreddit, query) for subreddit in subreddits], handle_page,
+                      start_date.timestamp(), end_date.timestamp(), headers=headers, cache=cache)
+else:
+    # All subreddits are paginated in parallel under the shared rate limiter
+    jobs = [search_job(subreddit, query) for subreddit in subreddits]
+    crawl_listings(jobs, handle_page, high_water=high_water, headers=headers, cache=cache)
+
+for subreddit, count in subreddit_counts.items():
+    print(f"  Collected {count} posts from r/{subreddit}")
+print(f"  Total: {posts_collected}\n")
+
+sink.close()
+store.finish_run(run_id, posts_collected)
+store.close()
 
 # ------------------------------
 # Save to CSV
 # ------------------------------
-df = pd.DataFrame(all_posts, columns=[
-    "title", "body", "url", "author", "upvotes", "comments", "date", "subreddit"
-])
-
-# Optional: convert date to readable format
-df["date"] = df["date"].apply(lambda x: x.strftime("%Y-%m-%d %H:%M:%S"))
-
-filename = f"dhaka_posts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-df.to_csv(filename, index=False, encoding='utf-8-sig')
+# Converted from the JSONL parts in chunks, so memory stays flat however long the run
+columns = ["title", "body", "url", "author", "upvotes", "comments", "date", "subreddit"]
+filename = f"{run_name}.csv"
+chunk = []
+written = 0
+pd.DataFrame(columns=columns).to_csv(filename, index=False, encoding='utf-8-sig')
+for record in read_sink(f"crawl_output/{run_name}"):
+    chunk.append(record)
+    if len(chunk) == 10000:
+        pd.DataFrame(chunk, columns=columns).to_csv(filename, mode='a', header=False, index=False, encoding='utf-8')
+        written += len(chunk)
+        chunk = []
+if chunk:
+    pd.DataFrame(chunk, columns=columns).to_csv(filename, mode='a', header=False, index=False, encoding='utf-8')
+    written += len(chunk)
 
-print(f"Saved {len(df)} posts to {filename}")
+print(f"Saved {written} posts to {filename} (JSONL parts: crawl_output/{run_name}-*)")
@@ -1,39 +1,16 @@
-import requests
 import pandas as pd
-from datetime import datetime, timedelta
-import time
 import json
 
+from listing_crawl import shared_listing
+from dhaka_gazetteer import AREA_INDEX, AREA_THANA, AREA_ZONE, ZONES, zone_counts
+from listing_filters import AreaFilter, all_dhaka_keywords
+
 print("=" * 100)
 print("ENHANCED DHAKA CRAWLER - ALL DIVISIONS, AREAS & COORDINATES")
 print("=" * 100)
 print()
 
-# Define all Dhaka areas and keywords
-dhaka_data = {
-    'DNCC (Dhaka North City Corporation)': {
-        'areas': ['Uttara', 'Mirpur', 'Pallabi', 'Shahjalal', 'Mohammadpur', 'Dhanmondi', 
-                  'Shyamoli', 'Tejgaon', 'Turag', 'Banani', 'Gulshan', 'Badda', 'Khilgaon', 
-                  'Shantinagar', 'Kallyanpur', 'Gabtoli', 'Agargaon'],
-        'coordinates': [(23.8753, 90.3961), (23.8130, 90.3663), (23.8050, 90.3800)]  # Uttara, Mirpur, Pallabi
-    },
-    'DSCC (Dhaka South City Corporation)': {
-        'areas': ['Old Dhaka', 'Puran Dhaka', 'Sadarghat', 'Lalbagh', 'Kotwali', 'Kamrangirchar',
-                  'Motijheel', 'Ramna', 'Baridhara', 'Jatrabari', 'Paltan', 'Banasree', 
-                  'Demra', 'Wari', 'Khilgaon'],
-        'coordinates': [(23.7461, 90.3760), (23.7286, 90.4144), (23.8103, 90.4125)]  # Dhanmondi, Motijheel, Center
-    },
-    'Other Notable Areas': {
-        'areas': ['Uttarkhan', 'Bashundhara', 'Mohakhali', 'Rampura', 'Khilkhet', 'Niketon',
-                  'Kafrul', 'Shyamoli'],
-        'coordinates': [(23.8103, 90.4125)]
-    }
-}
-
-# All Dhaka location keywords for searching
-all_dhaka_keywords = []
-for division, data in dhaka_data.items():
-    all_dhaka_keywords.extend(data['areas'])
+# Dhaka areas (thana, city corporation, centroid, spellings) live in dhaka_gazetteer.py
 
 print(f"📍 Dhaka Areas to Search: {len(all_dhaka_keywords)} locations")
 print(f"   {', '.join(all_dhaka_keywords[:10])}...")
@@ -42,96 +19,11 @@ print()
 def search_reddit_by_areas(subreddits, max_posts=1000):
     """Search Reddit for posts mentioning Dhaka areas"""
     
-    all_posts = []
-    posts_by_area = {}
+    # The listing is downloaded once and shared with crawl_by_user_location.py
+    area_filter = AreaFilter(max_posts=max_posts)
+    shared_listing(subreddits, [area_filter])
     
-    for subreddit in subreddits:
-        print(f"🔍 Searching r/{subreddit}...")
-        
-        try:
-            url = f"https://www.reddit.com/r/{subreddit}/new/.json"
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-            
-            params = {
-                'limit': 100,
-                'sort': 'new'
-            }
-            
-            after = None
-            collected = 0
-            
-            while collected < max_posts:
-                if after:
-                    params['after'] = after
-                
-                response = requests.get(url, headers=headers, params=params, timeout=10)
-                
-                if response.status_code != 200:
-                    print(f"   Error: Status {response.status_code}")
-                    break
-                
-                data = response.json()
-                posts = data.get('data', {}).get('children', [])
-                
-                if not posts:
-                    print(f"   No more posts found")
-                    break
-                
-                for post in posts:
-                    post_data = post.get('data', {})
-                    author = post_data.get('author')
-                    title = str(post_data.get('title', '')).lower()
-                    selftext = str(post_data.get('selftext', '')).lower()
-                    full_text = title + " " + selftext
-                    
-                    # Find which areas are mentioned
-                    mentioned_areas = []
-                    for area in all_dhaka_keywords:
-                        if area.lower() in full_text:
-                            mentioned_areas.append(area)
-                    
-                    if mentioned_areas:
-                        post_entry = {
-                            'title': post_data.get('title', ''),
-                            'author': author,
-                            'subreddit': subreddit,
-                            'upvotes': post_data.get('score', 0),
-                            'comments': post_data.get('num_comments', 0),
-                            'created': datetime.fromtimestamp(post_data.get('created_utc', 0)),
-                            'url': f"https://reddit.com{post_data.get('permalink', '')}",
-                            'areas_mentioned': ', '.join(mentioned_areas),
-                            'area_count': len(mentioned_areas),
-                            'content_preview': (post_data.get('selftext', '')[:150] or post_data.get('title', '')[:150])
-                        }
-                        
-                        all_posts.append(post_entry)
-                        
-                        # Track by area
-                        for area in mentioned_areas:
-                            if area not in posts_by_area:
-                                posts_by_area[area] = 0
-                            posts_by_area[area] += 1
-                        
-                        collected += 1
-                        
-                        if len(mentioned_areas) > 1:
-                            print(f"   ✓ [{', '.join(mentioned_areas)}] {post_data.get('title', '')[:60]}...")
-                        else:
-                            print(f"   ✓ [{mentioned_areas[0]}] {post_data.get('title', '')[:60]}...")
-                    
-                    if collected >= max_posts:
-                        break
-                
-                after = data.get('data', {}).get('after')
-                if not after:
-                    break
-                
-                time.sleep(1)  # Rate limiting
-        
-        except Exception as e:
-            print(f"   Error: {str(e)}")
-    
-    return all_posts, posts_by_area
+    return area_filter.posts, area_filter.posts_by_area
 
 # Search for posts
 subreddits = ['dhaka', 'bangladesh']
@@ -153,6 +45,13 @@ if posts:
     # Create DataFrame
     df = pd.DataFrame(posts)
     
+    # Place each post at its first-mentioned area; the gazetteer indexes are plain dict lookups
+    df['primary_area'] = df['areas_mentioned'].str.split(', ').str[0]
+    df['thana'] = df['primary_area'].map(AREA_THANA)
+    df['zone'] = df['primary_area'].map(AREA_ZONE)
+    df['lat'] = df['primary_area'].map(lambda area: AREA_INDEX[area].lat)
+    df['lon'] = df['primary_area'].map(lambda area: AREA_INDEX[area].lon)
+    
     # Save comprehensive data
     df.to_csv("dhaka_area_specific_posts.csv", index=False, encoding='utf-8')
     print(f"\n✓ Saved to: dhaka_area_specific_posts.csv")
@@ -166,6 +65,8 @@ if posts:
         
         area_summary.append({
             'area': area,
+            'thana': AREA_THANA.get(area),
+            'zone': AREA_ZONE.get(area),
             'posts': count,
             'avg_upvotes': avg_upvotes,
             'avg_comments': avg_comments,
@@ -201,6 +102,9 @@ if posts:
         print(f"   Upvotes: {top_post['upvotes']} | Comments: {top_post['comments']}")
         print(f"   Author: {top_post['author']}")
     
+    zone_totals = zone_counts(area_stats)
+    zone_posts = df.groupby('zone').agg(posts=('title', 'size'), avg_upvotes=('upvotes', 'mean'))
+    
     print()
     print("=" * 100)
     print("📈 STATISTICS")
@@ -219,11 +123,13 @@ Overall Engagement:
   • Avg Comments per Post: {df['comments'].mean():.1f}
   • Total Engagement: {(df['upvotes'].sum() + df['comments'].sum()):.0f}
 
-City Corporation Distribution:
-  • DNCC areas: {sum([count for area, count in area_stats.items() if area in dhaka_data['DNCC (Dhaka North City Corporation)']['areas']])} posts
-  • DSCC areas: {sum([count for area, count in area_stats.items() if area in dhaka_data['DSCC (Dhaka South City Corporation)']['areas']])} posts
-  • Other areas: {sum([count for area, count in area_stats.items() if area in dhaka_data['Other Notable Areas']['areas']])} posts
+City Corporation Distribution (area mentions):
+  • DNCC areas: {zone_totals['DNCC']} mentions
+  • DSCC areas: {zone_totals['DSCC']} mentions
 """)
+    print("Posts by city corporation (first-mentioned area):")
+    for zone, row in zone_posts.iterrows():
+        print(f"  • {ZONES[zone]}: {row['posts']} posts | Avg Upvotes: {row['avg_upvotes']:.1f}")
     
 else:
     print("\n⚠️  No area-specific posts found with direct mentions.")
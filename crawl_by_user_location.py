@@ -1,10 +1,12 @@
-import requests
 import pandas as pd
 import praw
 from datetime import datetime, timedelta
-import time
 import json
 
+from author_resolver import enrich_posts, resolve_authors
+from listing_crawl import shared_listing
+from listing_filters import LocationPhraseFilter
+
 print("=" * 100)
 print("COLLECTING POSTS FROM USERS LOCATED IN DHAKA")
 print("=" * 100)
@@ -16,110 +18,19 @@ print()
 
 def get_user_location(username):
     """Try to extract location from user profile"""
-    try:
-        url = f"https://www.reddit.com/user/{username}/about/.json"
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        response = requests.get(url, headers=headers, timeout=5)
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data.get('data', {})
-    except:
-        pass
-    return None
+    # Served from the shared author cache; use resolve_authors() directly for many users
+    return resolve_authors([username]).get(username)
 
 def search_reddit_by_location(location_keywords, subreddits, max_posts=500):
     """Search posts and filter by user location"""
     
-    all_posts = []
-    
-    for subreddit in subreddits:
-        print(f"\n🔍 Searching r/{subreddit}...")
-        
-        try:
-            url = f"https://www.reddit.com/r/{subreddit}/new/.json"
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-            
-            params = {
-                'limit': 100,
-                'sort': 'new'
-            }
-            
-            after = None
-            collected = 0
-            
-            while collected < max_posts:
-                if after:
-                    params['after'] = after
-                
-                response = requests.get(url, headers=headers, params=params, timeout=10)
-                
-                if response.status_code != 200:
-                    print(f"   Error: Status {response.status_code}")
-                    break
-                
-                data = response.json()
-                posts = data.get('data', {}).get('children', [])
-                
-                if not posts:
-                    print(f"   No more posts found")
-                    break
-                
-                for post in posts:
-                    post_data = post.get('data', {})
-                    author = post_data.get('author')
-                    
-                    if author and author != '[deleted]':
-                        # Try to get user location
-                        # Note: Reddit API doesn't expose location directly in posts
-                        # We would need to use PRAW with OAuth for full profile access
-                        
-                        # Alternative: Look for location mentions in post title/content
-                        title = str(post_data.get('title', '')).lower()
-                        selftext = str(post_data.get('selftext', '')).lower()
-                        
-                        full_text = title + " " + selftext
-                        
-                        # Check for Dhaka location keywords
-                        dhaka_keywords = [
-                            'dhaka', 'gulshan', 'banani', 'dhanmondi', 'mirpur',
-                            'baridhara', 'uttara', 'motijheel', 'kawran bazar',
-                            'badda', 'bashundhara', 'pallabi', 'mohakhali',
-                            'i am in dhaka', 'live in dhaka', 'based in dhaka',
-                            'located in dhaka', 'from dhaka'
-                        ]
-                        
-                        has_location = any(keyword in full_text for keyword in dhaka_keywords)
-                        
-                        if has_location:
-                            all_posts.append({
-                                'title': post_data.get('title', ''),
-                                'author': author,
-                                'subreddit': subreddit,
-                                'upvotes': post_data.get('score', 0),
-                                'comments': post_data.get('num_comments', 0),
-                                'created': datetime.fromtimestamp(post_data.get('created_utc', 0)),
-                                'url': f"https://reddit.com{post_data.get('permalink', '')}",
-                                'content_preview': (post_data.get('selftext', '')[:200] or post_data.get('title', '')[:200]),
-                                'location_indicator': 'Location mentioned in post'
-                            })
-                            
-                            print(f"   ✓ Found: {post_data.get('title', '')[:60]}...")
-                            collected += 1
-                    
-                    if collected >= max_posts:
-                        break
-                
-                after = data.get('data', {}).get('after')
-                if not after:
-                    break
-                
-                time.sleep(1)  # Rate limiting
-        
-        except Exception as e:
-            print(f"   Error: {str(e)}")
+    # Reddit API doesn't expose location directly in posts; LocationPhraseFilter looks
+    # for Dhaka location mentions in the title/content instead. The listing is
+    # downloaded once and shared with crawl_by_dhaka_areas.py.
+    location_filter = LocationPhraseFilter(max_posts=max_posts)
+    shared_listing(subreddits, [location_filter])
     
-    return all_posts
+    return location_filter.posts
 
 print("Note: This will search for posts that MENTION location as 'Dhaka'")
 print("to find users located in Dhaka.")
@@ -137,6 +48,11 @@ posts = search_reddit_by_location(['dhaka', 'gulshan'], subreddits, max_posts=30
 print(f"\n\n✓ Found {len(posts)} posts from users mentioning Dhaka location")
 
 if posts:
+    # Profile metadata costs one request per unique author, not per post,
+    # and authors seen in earlier runs come from author_cache/
+    profiles = resolve_authors(post['author'] for post in posts)
+    enrich_posts(posts, profiles)
+    
     # Create DataFrame
     df = pd.DataFrame(posts)
     
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import os
+import sys
+
+import aiohttp
+
+import reddit_client
+from jsonl_sink import JsonlSink, read_sink, sink_parts
+from post_identity import post_id_from_url
+from reddit_client import RedditClient, RedditHTTPError
+
+# ------------------------------
+# Comment-tree ingestion: /comments/{id}.json flattened into a parent-pointer table
+# ------------------------------
+INPUT_FILE = 'final_dhaka_dataset.json'
+OUTPUT_BASE = 'comments/comments'
+MORE_BATCH = 100        # /api/morechildren accepts up to 100 ids per call
+
+
+def comment_row(post_id, data, depth):
+    """One row of the parent-pointer table"""
+    return {
+        'kind': 'comment',
+        'post_id': post_id,
+        'comment_id': data.get('id'),
+        'parent_id': data.get('parent_id'),     # t3_<post> for top level, t1_<comment> otherwise
+        'depth': depth,
+        'author': data.get('author'),
+        'body': data.get('body', ''),
+        'score': data.get('score', 0),
+        'created_utc': data.get('created_utc')
+    }
+
+
+def more_row(post_id, data, depth):
+    """Placeholder for a "load more" stub, expanded lazily"""
+    return {
+        'kind': 'more',
+        'post_id': post_id,
+        'parent_id': data.get('parent_id'),
+        'depth': depth,
+        'children': data.get('children', []),
+        'count': data.get('count', 0)
+    }
+
+
+def flatten_comments(post_id, children, depth=0):
+    """Walk a comment listing depth-first into (comment rows, more rows)"""
+    rows = []
+    more = []
+    stack = [(child, depth) for child in reversed(children)]
+    while stack:
+        child, level = stack.pop()
+        data = child.get('data', {})
+        if child.get('kind') == 'more':
+            if data.get('children'):
+                more.append(more_row(post_id, data, level))
+            continue
+        if child.get('kind') != 't1':
+            continue
+        rows.append(comment_row(post_id, data, level))
+        replies = data.get('replies')
+        if isinstance(replies, dict):
+            for reply in reversed(replies.get('data', {}).get('children', [])):
+                stack.append((reply, level + 1))
+    return rows, more
+
+
+async def fetch_comment_tree(client, post_id, limit=500):
+    """Fetch and flatten one post's comment tree"""
+    data = await client.get_json(f"{reddit_client.REDDIT_BASE}/comments/{post_id}.json", {'limit': limit, 'raw_json': 1})
+    if not isinstance(data, list) or len(data) < 2:
+        return [], []
+    return flatten_comments(post_id, data[1].get('data', {}).get('children', []))
+
+
+async def expand_more(client, more):
+    """Resolve one "load more" stub through /api/morechildren; returns (rows, new more stubs)"""
+    post_id = more['post_id']
+    rows = []
+    pending = []
+    ids = more['children']
+    for i in range(0, len(ids), MORE_BATCH):
+        params = {
+            'link_id': f"t3_{post_id}",
+            'children': ','.join(ids[i:i + MORE_BATCH]),
+            'api_type': 'json',
+            'raw_json': 1
+        }
+        data = await client.get_json(f"{reddit_client.REDDIT_BASE}/api/morechildren.json", params)
+        things = data.get('json', {}).get('data', {}).get('things', [])
+        # morechildren returns a flat list; depth follows from the parent pointers
+        depths = {}
+        for thing in things:
+            thing_data = thing.get('data', {})
+            parent = thing_data.get('parent_id', '')
+            depth = depths.get(parent, more['depth'])
+            if thing.get('kind') == 'more':
+                if thing_data.get('children'):
+                    pending.append(more_row(post_id, thing_data, depth))
+            elif thing.get('kind') == 't1':
+                rows.append(comment_row(post_id, thing_data, depth))
+                depths[f"t1_{thing_data.get('id')}"] = depth + 1
+    return rows, pending
+
+
+async def expand_stubs(client, rows, more):
+    """Resolve stubs into `rows`, recursively; after an error the unresolved stubs stay in `more`"""
+    while more:
+        stub = more.pop()
+        try:
+            extra_rows, extra_more = await expand_more(client, stub)
+        except (aiohttp.ClientError, asyncio.TimeoutError, RedditHTTPError) as e:
+            print(f"   Could not expand more comments of {stub['post_id']}: {e}")
+            more.append(stub)
+            break
+        rows.extend(extra_rows)
+        more.extend(extra_more)
+    return rows, more
+
+
+async def ingest_comments_async(client, post_ids, sink, expand=False, limit=500):
+    """Fetch every post's comment tree concurrently under the shared rate limiter
+
+    "Load more" stubs are written as kind='more' rows; with expand=True they are
+    resolved right away (and any stubs they return, recursively). A stub that fails
+    to expand is stored as it is, next to the rows already fetched, for
+    expand_stored to pick up later.
+    """
+    totals = {'posts': 0, 'comments': 0, 'more': 0}
+
+    async def run_post(post_id):
+        try:
+            rows, more = await fetch_comment_tree(client, post_id, limit)
+        except (aiohttp.ClientError, asyncio.TimeoutError, RedditHTTPError) as e:
+            print(f"   Error on {post_id}: {e}")
+            return
+        if expand:
+            await expand_stubs(client, rows, more)
+        sink.write_many(rows)
+        sink.write_many(more)
+        sink.flush()
+        totals['posts'] += 1
+        totals['comments'] += len(rows)
+        totals['more'] += len(more)
+        if totals['posts'] % 50 == 0:
+            print(f"  Processing: {totals['posts']}/{len(post_ids)} posts...", end='\r')
+
+    await asyncio.gather(*(run_post(post_id) for post_id in post_ids))
+    return totals
+
+
+async def expand_stored_async(client, records):
+    """Records of a stored output with its 'load more' stubs resolved where possible"""
+    rows = [record for record in records if record.get('kind') != 'more']
+    stubs = {}
+    for record in records:
+        if record.get('kind') == 'more':
+            stubs.setdefault(record['post_id'], []).append(record)
+    results = await asyncio.gather(*(expand_stubs(client, [], more) for more in stubs.values()))
+    new_rows = [row for expanded, _ in results for row in expanded]
+    remaining = [stub for _, more in results for stub in more]
+    return rows + new_rows + remaining, {'comments': len(new_rows), 'more': len(remaining)}
+
+
+def select_posts(posts, min_comments=1, max_posts=None):
+    """Post ids worth fetching, most-discussed first"""
+    selected = []
+    seen = set()
+    for post in sorted(posts, key=lambda p: p.get('comments') or 0, reverse=True):
+        if (post.get('comments') or 0) < min_comments:
+            break
+        post_id = post_id_from_url(post.get('permalink')) or post_id_from_url(post.get('url'))
+        if post_id and post_id not in seen:
+            seen.add(post_id)
+            selected.append(post_id)
+    return selected[:max_posts] if max_posts else selected
+
+
+def ingest_comments(post_ids, output_base=OUTPUT_BASE, expand=False, **client_kwargs):
+    """Blocking entry point"""
+
+    async def run():
+        async with RedditClient(**client_kwargs) as client:
+            with JsonlSink(output_base) as sink:
+                totals = await ingest_comments_async(client, post_ids, sink, expand)
+            stats = client.stats
+            print(f"   Requests: {stats['requests']} | Retries: {stats['retries']} | "
+                  f"429s: {stats['throttled']} | Throttled: {stats['throttle_seconds']:.1f}s")
+            return totals
+
+    return asyncio.run(run())
+
+
+def expand_stored(output_base=OUTPUT_BASE, **client_kwargs):
+    """Resolve the 'load more' stubs of an earlier run's output and rewrite it
+
+    The new parts are written under a temporary base first and only then replace
+    the old ones, so an interrupted expansion leaves the stored output intact.
+    """
+    records = list(read_sink(output_base))
+
+    async def run():
+        async with RedditClient(**client_kwargs) as client:
+            return await expand_stored_async(client, records)
+
+    records, totals = asyncio.run(run())
+    tmp_base = f"{output_base}-expanding"
+    for path in sink_parts(tmp_base):
+        os.remove(path)
+    with JsonlSink(tmp_base) as sink:
+        sink.write_many(records)
+    for path in sink_parts(output_base):
+        os.remove(path)
+    for path in sink_parts(tmp_base):
+        os.replace(path, output_base + path[len(tmp_base):])
+    return totals
+
+
+if __name__ == "__main__":
+    print("=" * 100)
+    print("COMMENT-TREE INGESTION")
+    print("=" * 100)
+
+    if '--expand-stored' in sys.argv:
+        # Resolve the stubs a previous run left in OUTPUT_BASE, without refetching the trees
+        totals = expand_stored()
+        print(f"\n✓ {totals['comments']} comments added from stored stubs "
+              f"({totals['more']} 'load more' stubs still unexpanded)")
+        sys.exit(0)
+
+    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+        posts = json.load(f)
+
+    post_ids = select_posts(posts, min_comments=1)
+    print(f"📂 {len(post_ids)} posts with comments in {INPUT_FILE}")
+
+    # `--expand-more` also resolves "load more" stubs instead of leaving them for later
+    totals = ingest_comments(post_ids, expand='--expand-more' in sys.argv)
+
+    print(f"\n✓ {totals['comments']} comments from {totals['posts']} posts "
+          f"({totals['more']} unexpanded 'load more' stubs)")
+    print(f"✓ Saved to {OUTPUT_BASE}-*.jsonl")
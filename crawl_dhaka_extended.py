@@ -1,7 +1,13 @@
-import requests
-import json
-import time
-from datetime import datetime
+import sys
+from datetime import datetime, timedelta
+
+from crawl_state import CrawlCheckpoint, HighWaterMarks
+from jsonl_sink import JsonlSink, read_sink
+from post_identity import fullname
+from post_store import PostStore
+from reddit_client import crawl_listings, search_job
+from response_cache import ResponseCache
+from search_partition import crawl_time_sliced
 
 def generate_dhaka_query():
     # 1. Define your keyword groups
@@ -39,7 +45,9 @@ def generate_dhaka_query():
         
     return queries
 
-def crawl_reddit_extended(max_posts=2000):
+def crawl_reddit_extended(max_posts=2000, checkpoint_file='checkpoints/dhaka_extended.jsonl',
+                          incremental=False, marks_file='checkpoints/dhaka_extended_marks.json',
+                          date_range_days=None):
     queries = generate_dhaka_query()
     print(f"Generated {len(queries)} sub-queries to cover all keywords.")
     
@@ -48,81 +56,97 @@ def crawl_reddit_extended(max_posts=2000):
     }
     
     subreddits = ["bangladesh", "dhaka"]
-    all_posts = {} # Use dict for deduplication by URL
+    output_base = 'e:/Reddit/dhaka_extended_posts'
     
-    for query_string in queries:
-        print(f"\n--- Processing Query Chunk: {query_string[:50]}... ---")
-        
-        for sub in subreddits:
-            print(f"  Searching r/{sub}...")
-            url = f"https://www.reddit.com/r/{sub}/search.json"
-            after = None
-            chunk_posts_count = 0
+    # Every page is checkpointed, so a rerun after a crash resumes where it stopped
+    checkpoint = CrawlCheckpoint(checkpoint_file)
+    resuming = bool(checkpoint.pages)
+    if resuming:
+        print(f"Resuming from {checkpoint_file} ({len(checkpoint.pages)} pages already fetched)")
+    
+    # Incremental mode: keep the previous output and only fetch posts newer than
+    # the last run's high-water mark for each (subreddit, query chunk)
+    high_water = HighWaterMarks(marks_file) if incremental else None
+    
+    # Posts are appended to JSONL parts as they arrive; only their ids stay in memory.
+    # Deduplication is by Reddit fullname: distinct posts linking the same article are
+    # all kept, reposts/crossposts are grouped later by post_identity.duplicate_groups
+    seen_posts = set()
+    if incremental or resuming:
+        seen_posts = {fullname(post) or post['url'] for post in read_sink(output_base)}
+        print(f"{len(seen_posts)} posts already in {output_base}-*.jsonl")
+    sink = JsonlSink(output_base, append=incremental or resuming)
+    
+    # Every fetched post also goes to the shared post store; posts seen again
+    # (in another query chunk or a later run) get their upvotes/comments refreshed
+    store = PostStore()
+    run_id = store.start_run('dhaka_extended')
+    
+    def handle_page(job, children):
+        for child in children:
+            post = child['data']
+            post_url = post.get('url')
+            key = fullname(post) or post_url
             
-            while chunk_posts_count < 200: # Limit per chunk per sub to avoid excessive requests
-                params = {
-                    'q': query_string,
-                    'sort': 'new',
-                    'limit': 100,
-                    'restrict_sr': 'on',
-                    't': 'all'
+            if key not in seen_posts:
+                post_data = {
+                    'title': post.get('title'),
+                    'body': post.get('selftext', ''),
+                    'url': post_url,
+                    'author': post.get('author'),
+                    'upvotes': post.get('ups'),
+                    'comments': post.get('num_comments'),
+                    'date': datetime.fromtimestamp(post.get('created_utc')).strftime('%Y-%m-%d %H:%M:%S'),
+                    'subreddit': post.get('subreddit'),
+                    'permalink': f"https://www.reddit.com{post.get('permalink')}",
+                    'fullname': post.get('name'),
+                    'crosspost_parent': post.get('crosspost_parent')
                 }
-                if after:
-                    params['after'] = after
-                    
-                try:
-                    response = requests.get(url, headers=headers, params=params)
-                    
-                    if response.status_code != 200:
-                        print(f"    Error: {response.status_code}")
-                        break
-                        
-                    data = response.json()
-                    children = data.get('data', {}).get('children', [])
-                    
-                    if not children:
-                        break
-                        
-                    for child in children:
-                        post = child['data']
-                        post_url = post.get('url')
-                        
-                        if post_url not in all_posts:
-                            post_data = {
-                                'title': post.get('title'),
-                                'body': post.get('selftext', ''),
-                                'url': post_url,
-                                'author': post.get('author'),
-                                'upvotes': post.get('ups'),
-                                'comments': post.get('num_comments'),
-                                'date': datetime.fromtimestamp(post.get('created_utc')).strftime('%Y-%m-%d %H:%M:%S'),
-                                'subreddit': post.get('subreddit'),
-                                'permalink': f"https://www.reddit.com{post.get('permalink')}"
-                            }
-                            all_posts[post_url] = post_data
-                    
-                    chunk_posts_count += len(children)
-                    print(f"    Fetched {len(children)} posts. Total unique: {len(all_posts)}")
-                    
-                    after = data.get('data', {}).get('after')
-                    if not after:
-                        break
-                        
-                    time.sleep(1)
-                    
-                except Exception as e:
-                    print(f"    Exception: {e}")
-                    break
+                seen_posts.add(key)
+                sink.write(post_data)
+        sink.flush()
+        store.upsert_posts(child['data'] for child in children)
+        
+        sub, query_string = job.key[:2]
+        print(f"    r/{sub} {query_string[:30]}...: fetched {len(children)} posts. Total unique: {len(seen_posts)}")
     
-    # Convert back to list
-    final_posts = list(all_posts.values())
+    # Re-runs during development are served from http_cache/; incremental runs need live pages
+    cache = None if incremental else ResponseCache()
     
-    # Save to JSON
-    output_file = 'e:/Reddit/dhaka_extended_posts.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(final_posts, f, indent=4, ensure_ascii=False)
-        
-    print(f"\nSaved {len(final_posts)} unique posts to {output_file}")
+    if date_range_days and not incremental:
+        # Full coverage of the window: every (query chunk, subreddit) search is split into
+        # time slices, narrowed where the ~1000-result cap bites, and crawled in parallel
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=date_range_days)
+        searches = [(sub, query_string) for query_string in queries for sub in subreddits]
+        crawl_time_sliced(searches, handle_page, start_date.timestamp(), end_date.timestamp(),
+                          checkpoint=checkpoint, headers=headers, cache=cache)
+        finished = checkpoint.all_done()
+    else:
+        # Every (query chunk, subreddit) pair is paginated in parallel up to the rate budget.
+        # Limit per chunk per sub to avoid excessive requests.
+        jobs = [
+            search_job(sub, query_string, max_items=200, t='all')
+            for query_string in queries
+            for sub in subreddits
+        ]
+        crawl_listings(jobs, handle_page, checkpoint=checkpoint, high_water=high_water, headers=headers, cache=cache)
+        finished = checkpoint.all_done(jobs)
+    
+    sink.close()
+    store.finish_run(run_id, len(seen_posts))
+    store.close()
+    print(f"\nSaved {len(seen_posts)} unique posts to {output_base}-*.jsonl")
+    if finished:
+        checkpoint.clear()
+    else:
+        # Jobs that stopped on an error stay open; rerunning resumes them and keeps the parts
+        print(f"⚠️  Some searches did not finish; rerun to resume from {checkpoint_file}")
 
 if __name__ == "__main__":
-    crawl_reddit_extended()
+    # `python crawl_dhaka_extended.py --incremental` for a cheap daily refresh,
+    # `--full-year` to backfill a year of posts with time-sliced search
+    crawl_reddit_extended(
+        incremental='--incremental' in sys.argv,
+        date_range_days=365 if '--full-year' in sys.argv else None
+    )
@@ -0,0 +1,159 @@
+import json
+import os
+from urllib.parse import urlencode
+
+# ------------------------------
+# Persistent crawl state shared by the crawl_* scripts
+# ------------------------------
+
+def job_id(job):
+    """Stable identifier for a ListingJob: endpoint plus its sorted query params"""
+    return f"{job.url}?{urlencode(sorted(job.params.items()))}"
+
+
+class CrawlCheckpoint:
+    """Append-only page log so an interrupted crawl resumes from its `after` cursors
+
+    Every fetched page is written as one JSON line holding the job, its subreddit/query
+    key, the next `after` cursor, the running item count and the raw children. On
+    restart the log is replayed into the script's page handler (rebuilding the posts
+    collected so far) and each unfinished job continues from its last cursor.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.cursors = {}   # job id -> {'key', 'after', 'fetched', 'done'}
+        self.pages = []     # (job id, children) in fetch order
+        self.failed = set() # job ids that stopped on an error during this run
+
+        if os.path.exists(path):
+            self._load()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.log = open(path, 'a', encoding='utf-8')
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash mid-write; that page is simply refetched
+                    continue
+                self.cursors[entry['job']] = {
+                    'key': entry['key'],
+                    'after': entry['after'],
+                    'fetched': entry['fetched'],
+                    'done': entry['done']
+                }
+                if entry['children']:
+                    self.pages.append((entry['job'], entry['children']))
+
+    def state(self, job):
+        """Saved (after, fetched, done) for a job; fresh jobs start at (None, 0, False)"""
+        cursor = self.cursors.get(job_id(job))
+        if cursor is None:
+            return None, 0, False
+        return cursor['after'], cursor['fetched'], cursor['done']
+
+    def replay(self, jobs):
+        """Yield (job, children) for every logged page that belongs to one of `jobs`"""
+        by_id = {job_id(job): job for job in jobs}
+        for jid, children in self.pages:
+            if jid in by_id:
+                yield by_id[jid], children
+
+    def record_page(self, job, children, after, fetched, done=False):
+        """Append one page and its cursor; flushed so a crash loses at most this page"""
+        jid = job_id(job)
+        entry = {
+            'job': jid,
+            'key': job.key,
+            'after': after,
+            'fetched': fetched,
+            'done': done,
+            'children': children
+        }
+        self.log.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.log.flush()
+        os.fsync(self.log.fileno())
+        self.cursors[jid] = {'key': job.key, 'after': after, 'fetched': fetched, 'done': done}
+
+    def mark_done(self, job):
+        """Record that a job ran to completion"""
+        after, fetched, done = self.state(job)
+        if not done:
+            self.record_page(job, [], after, fetched, done=True)
+
+    def mark_failed(self, job):
+        """Remember a job that stopped on an error; its cursor stays open for the next run"""
+        self.failed.add(job_id(job))
+
+    def all_done(self, jobs=None):
+        """True when every job ran to completion (default: every job logged or failed)"""
+        ids = set(self.cursors) | self.failed if jobs is None else {job_id(job) for job in jobs}
+        return all(self.cursors.get(jid, {}).get('done') for jid in ids)
+
+    def clear(self):
+        """Drop the checkpoint after the crawl's output has been written"""
+        self.log.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.cursors = {}
+        self.pages = []
+
+
+class HighWaterMarks:
+    """Newest post (created_utc, fullname) seen per subreddit/query job, for incremental crawls
+
+    Marks only move forward once a job finishes cleanly, so a crawl that dies
+    halfway re-covers the gap on the next run instead of skipping it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.marks = {}     # job id -> {'key', 'created_utc', 'fullname'}
+        self.pending = {}   # newest post seen by the current run, not yet committed
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.marks = json.load(f)
+
+    def is_known(self, job, child):
+        """True if a listing child is no newer than what an earlier run already fetched"""
+        mark = self.marks.get(job_id(job))
+        if mark is None:
+            return False
+        post = child.get('data', {})
+        return post.get('created_utc', 0) <= mark['created_utc']
+
+    def advance(self, job, children):
+        """Remember the newest post in a page for this run"""
+        jid = job_id(job)
+        for child in children:
+            post = child.get('data', {})
+            created = post.get('created_utc', 0)
+            newest = self.pending.get(jid) or self.marks.get(jid)
+            if newest is None or created > newest['created_utc']:
+                self.pending[jid] = {
+                    'key': job.key,
+                    'created_utc': created,
+                    'fullname': post.get('name')
+                }
+
+    def commit(self, job):
+        """Persist this run's newest post for a job that finished cleanly"""
+        pending = self.pending.pop(job_id(job), None)
+        if pending is None:
+            return
+        self.marks[job_id(job)] = pending
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.marks, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,122 @@
+from collections import namedtuple
+
+import numpy as np
+
+from area_matcher import GazetteerMatcher
+
+# ------------------------------
+# Dhaka gazetteer: area -> thana -> city corporation, centroids and spellings
+# ------------------------------
+Area = namedtuple('Area', ['name', 'thana', 'zone', 'lat', 'lon', 'spellings'])
+
+ZONES = {
+    'DNCC': 'Dhaka North City Corporation',
+    'DSCC': 'Dhaka South City Corporation',
+}
+
+AREAS = [
+    # DNCC
+    Area('Uttara', 'Uttara West', 'DNCC', 23.8759, 90.3795, ['Uttara', 'উত্তরা']),
+    Area('Mirpur', 'Mirpur Model', 'DNCC', 23.8223, 90.3654, ['Mirpur', 'মিরপুর']),
+    Area('Pallabi', 'Pallabi', 'DNCC', 23.8290, 90.3630, ['Pallabi', 'Pallobi', 'পল্লবী']),
+    Area('Shahjalal', 'Airport', 'DNCC', 23.8433, 90.3978, ['Shahjalal', 'Shah Jalal', 'শাহজালাল']),
+    Area('Mohammadpur', 'Mohammadpur', 'DNCC', 23.7662, 90.3589,
+         ['Mohammadpur', 'Mohammedpur', 'Mohammodpur', 'মোহাম্মদপুর']),
+    Area('Shyamoli', 'Adabor', 'DNCC', 23.7740, 90.3650, ['Shyamoli', 'Shamoli', 'শ্যামলী']),
+    Area('Tejgaon', 'Tejgaon', 'DNCC', 23.7639, 90.3926, ['Tejgaon', 'Tejgaon I/A', 'তেজগাঁও']),
+    Area('Kawran Bazar', 'Tejgaon', 'DNCC', 23.7510, 90.3935,
+         ['Kawran Bazar', 'Karwan Bazar', 'Kawran Bazaar', 'কারওয়ান বাজার']),
+    Area('Turag', 'Turag', 'DNCC', 23.8850, 90.3700, ['Turag', 'তুরাগ']),
+    Area('Banani', 'Banani', 'DNCC', 23.7940, 90.4043, ['Banani', 'বনানী']),
+    Area('Mohakhali', 'Banani', 'DNCC', 23.7781, 90.4050, ['Mohakhali', 'মহাখালী']),
+    Area('Gulshan', 'Gulshan', 'DNCC', 23.7808, 90.4167, ['Gulshan', 'গুলশান']),
+    Area('Baridhara', 'Gulshan', 'DNCC', 23.8000, 90.4210, ['Baridhara', 'বারিধারা']),
+    Area('Niketon', 'Gulshan', 'DNCC', 23.7740, 90.4110, ['Niketon', 'Niketan', 'নিকেতন']),
+    Area('Badda', 'Badda', 'DNCC', 23.7805, 90.4267, ['Badda', 'বাড্ডা']),
+    Area('Rampura', 'Rampura', 'DNCC', 23.7612, 90.4197, ['Rampura', 'রামপুরা']),
+    Area('Bashundhara', 'Vatara', 'DNCC', 23.8193, 90.4526,
+         ['Bashundhara', 'Bosundhora', 'Bashundhara R/A', 'বসুন্ধরা']),
+    Area('Kallyanpur', 'Mirpur Model', 'DNCC', 23.7820, 90.3600, ['Kallyanpur', 'Kalyanpur', 'কল্যাণপুর']),
+    Area('Gabtoli', 'Darus Salam', 'DNCC', 23.7836, 90.3444, ['Gabtoli', 'Gabtali', 'গাবতলী']),
+    Area('Agargaon', 'Sher-e-Bangla Nagar', 'DNCC', 23.7779, 90.3790, ['Agargaon', 'আগারগাঁও']),
+    Area('Kafrul', 'Kafrul', 'DNCC', 23.7925, 90.3860, ['Kafrul', 'কাফরুল']),
+    Area('Khilkhet', 'Khilkhet', 'DNCC', 23.8300, 90.4200, ['Khilkhet', 'খিলক্ষেত']),
+    Area('Uttarkhan', 'Uttarkhan', 'DNCC', 23.8700, 90.4300, ['Uttarkhan', 'উত্তরখান']),
+    # DSCC
+    Area('Dhanmondi', 'Dhanmondi', 'DSCC', 23.7461, 90.3742, ['Dhanmondi', 'Dhanmandi', 'ধানমন্ডি', 'ধানমণ্ডি']),
+    Area('Old Dhaka', 'Kotwali', 'DSCC', 23.7104, 90.4074,
+         ['Old Dhaka', 'Puran Dhaka', 'পুরান ঢাকা', 'পুরনো ঢাকা']),
+    Area('Sadarghat', 'Kotwali', 'DSCC', 23.7058, 90.4108, ['Sadarghat', 'Sadar Ghat', 'সদরঘাট']),
+    Area('Kotwali', 'Kotwali', 'DSCC', 23.7105, 90.4060, ['Kotwali', 'Kotoali', 'কোতোয়ালি']),
+    Area('Lalbagh', 'Lalbagh', 'DSCC', 23.7190, 90.3882, ['Lalbagh', 'Lalbag', 'লালবাগ']),
+    Area('Kamrangirchar', 'Kamrangirchar', 'DSCC', 23.7167, 90.3700,
+         ['Kamrangirchar', 'Kamrangir Char', 'কামরাঙ্গীরচর']),
+    Area('Motijheel', 'Motijheel', 'DSCC', 23.7330, 90.4172, ['Motijheel', 'Motijhil', 'মতিঝিল']),
+    Area('Ramna', 'Ramna', 'DSCC', 23.7380, 90.3990, ['Ramna', 'রমনা']),
+    Area('Paltan', 'Paltan', 'DSCC', 23.7340, 90.4130, ['Paltan', 'Purana Paltan', 'পল্টন']),
+    Area('Shantinagar', 'Paltan', 'DSCC', 23.7405, 90.4150, ['Shantinagar', 'Shanti Nagar', 'শান্তিনগর']),
+    Area('Khilgaon', 'Khilgaon', 'DSCC', 23.7516, 90.4267, ['Khilgaon', 'খিলগাঁও']),
+    Area('Banasree', 'Khilgaon', 'DSCC', 23.7630, 90.4330, ['Banasree', 'Banashree', 'Banasri', 'বনশ্রী']),
+    Area('Jatrabari', 'Jatrabari', 'DSCC', 23.7100, 90.4350, ['Jatrabari', 'Jattrabari', 'যাত্রাবাড়ী', 'যাত্রাবাড়ি']),
+    Area('Wari', 'Wari', 'DSCC', 23.7190, 90.4210, ['Wari', 'ওয়ারী', 'ওয়ারি']),
+    Area('Demra', 'Demra', 'DSCC', 23.7225, 90.4950, ['Demra', 'ডেমরা']),
+]
+
+# Whole-city and country names, for relevance checks rather than area breakdowns
+REGION_SPELLINGS = {
+    'Dhaka': ['Dhaka', 'Dacca', 'Dhakaiya', 'Dhakaiyas', 'ঢাকা'],
+    'DNCC': ['DNCC', 'Dhaka North City Corporation', 'ঢাকা উত্তর সিটি কর্পোরেশন'],
+    'DSCC': ['DSCC', 'Dhaka South City Corporation', 'ঢাকা দক্ষিণ সিটি কর্পোরেশন'],
+    'Bangladesh': ['Bangladesh', 'Bangladeshi', 'Bangladeshis', 'BD', 'Bengal', 'Bengali', 'Bengalis', 'বাংলাদেশ', 'বাঙ্গালাদেশ'],
+}
+
+# Landmarks that hint at Dhaka but are not areas ("the airport" may be any airport)
+LANDMARK_SPELLINGS = {
+    'Airport': ['Airport'],
+}
+
+# Reverse indexes, built once
+AREA_INDEX = {area.name: area for area in AREAS}
+AREA_THANA = {area.name: area.thana for area in AREAS}
+AREA_ZONE = {area.name: area.zone for area in AREAS}
+THANA_ZONE = {area.thana: area.zone for area in AREAS}
+ZONE_AREAS = {zone: [area.name for area in AREAS if area.zone == zone] for zone in ZONES}
+THANA_AREAS = {}
+for _area in AREAS:
+    THANA_AREAS.setdefault(_area.thana, []).append(_area.name)
+
+AREA_SPELLINGS = {area.name: area.spellings for area in AREAS}
+AREA_LABELS = set(AREA_SPELLINGS)
+DHAKA_LABELS = AREA_LABELS | set(LANDMARK_SPELLINGS) | {'Dhaka', 'DNCC', 'DSCC'}
+
+# Centroids in AREAS order, for vectorised distance queries
+AREA_NAMES = np.array([area.name for area in AREAS])
+AREA_LATLON = np.radians(np.array([(area.lat, area.lon) for area in AREAS]))
+
+EARTH_RADIUS_KM = 6371.0
+
+# One automaton for every script that looks for Dhaka places
+dhaka_matcher = GazetteerMatcher({**AREA_SPELLINGS, **REGION_SPELLINGS, **LANDMARK_SPELLINGS})
+
+
+def zone_counts(area_counts):
+    """Roll {area: count} up to {zone: count}; unknown areas are skipped"""
+    totals = dict.fromkeys(ZONES, 0)
+    for area, count in area_counts.items():
+        zone = AREA_ZONE.get(area)
+        if zone is not None:
+            totals[zone] += count
+    return totals
+
+
+def nearest_area(lat, lon):
+    """Nearest area centroid and its distance in km, for scalars or whole arrays of points"""
+    lat = np.radians(np.asarray(lat, dtype=float))[..., None]
+    lon = np.radians(np.asarray(lon, dtype=float))[..., None]
+    dlat = AREA_LATLON[:, 0] - lat
+    dlon = AREA_LATLON[:, 1] - lon
+    # Haversine against every centroid at once: points x areas
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat) * np.cos(AREA_LATLON[:, 0]) * np.sin(dlon / 2) ** 2
+    distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(h))
+    index = distances.argmin(axis=-1)
+    return AREA_NAMES[index], np.take_along_axis(distances, index[..., None], axis=-1)[..., 0]
@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import aiohttp
+import requests
+
+import reddit_client
+from post_identity import post_id_from_url
+from reddit_client import RedditClient, RedditHTTPError
+
+# ------------------------------
+# Media downloads driven by the `url` column: resumable, hash-verified, content-addressed
+# ------------------------------
+INPUT_FILE = 'final_dhaka_dataset.json'
+STORE_DIR = 'media_store'
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+CHUNK_SIZE = 1024 * 1024
+
+
+def get_media_type(url):
+    """Same classification as generate_json_report.py"""
+    if not isinstance(url, str): return 'Text'
+    url_lower = url.lower()
+    if 'i.redd.it' in url_lower or 'imgur' in url_lower: return 'Image'
+    if 'v.redd.it' in url_lower or 'youtube' in url_lower or 'youtu.be' in url_lower: return 'Video'
+    if 'reddit.com/gallery' in url_lower: return 'Gallery'
+    if 'reddit.com' in url_lower: return 'Text/Link'
+    return 'External Link'
+
+
+def direct_image_url(url):
+    """i.redd.it links are direct; imgur page links map to i.imgur.com (albums are skipped)"""
+    if 'i.redd.it' in url or 'i.imgur.com' in url:
+        return url
+    match = re.search(r'imgur\.com/([A-Za-z0-9]+)$', url.rstrip('/'))
+    if match:
+        return f"https://i.imgur.com/{match.group(1)}.jpg"
+    return None
+
+
+async def fetch_post_data(client, post_id):
+    data = await client.get_json(f"{reddit_client.REDDIT_BASE}/comments/{post_id}.json", {'raw_json': 1})
+    return data[0]['data']['children'][0]['data']
+
+
+async def resolve_media_async(client, posts):
+    """[(post url, media url)] for every downloadable image, gallery item and Reddit video
+
+    The post url is the permalink where there is one, so crossposts/reposts of the
+    same image stay distinguishable.
+    """
+    resolved = []
+
+    async def resolve(post):
+        url = post.get('url')
+        post_url = post.get('permalink') or url
+        media_type = get_media_type(url)
+        try:
+            if media_type == 'Image':
+                direct = direct_image_url(url)
+                if direct:
+                    resolved.append((post_url, direct))
+
+            elif media_type == 'Gallery':
+                # Gallery items live in the post's media_metadata, in gallery_data order
+                data = await fetch_post_data(client, url.rstrip('/').split('/')[-1])
+                metadata = data.get('media_metadata') or {}
+                for item in (data.get('gallery_data') or {}).get('items', []):
+                    source = metadata.get(item.get('media_id'), {}).get('s', {})
+                    if source.get('u'):
+                        resolved.append((post_url, html.unescape(source['u'])))
+
+            elif media_type == 'Video' and 'v.redd.it' in url.lower():
+                post_id = post_id_from_url(post.get('permalink'))
+                if post_id is None:
+                    return
+                data = await fetch_post_data(client, post_id)
+                video = ((data.get('secure_media') or data.get('media') or {}).get('reddit_video') or {})
+                if video.get('fallback_url'):
+                    resolved.append((post_url, video['fallback_url'].split('?')[0]))
+        except (aiohttp.ClientError, asyncio.TimeoutError, RedditHTTPError, KeyError, IndexError) as e:
+            print(f"   Could not resolve {url}: {e}")
+
+    await asyncio.gather(*(resolve(post) for post in posts))
+    return resolved
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def download_file(media_url, store_dir=STORE_DIR, timeout=30):
+    """Worker: download one file with Range resume, verify it and move it into the object store"""
+    partial_dir = os.path.join(store_dir, 'partial')
+    os.makedirs(partial_dir, exist_ok=True)
+    url_key = hashlib.sha1(media_url.encode('utf-8')).hexdigest()
+    partial_path = os.path.join(partial_dir, url_key + '.part')
+    ext = os.path.splitext(media_url.split('?')[0])[1].lower() or '.bin'
+
+    try:
+        offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+        headers = dict(HEADERS)
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+
+        with requests.get(media_url, headers=headers, stream=True, timeout=timeout) as response:
+            if response.status_code == 416:
+                # Range starts at the end: the partial file is already complete
+                expected = offset
+            elif response.status_code in (200, 206):
+                if response.status_code == 200:
+                    offset = 0      # server ignored the Range header; start over
+                length = response.headers.get('Content-Length')
+                expected = offset + int(length) if length is not None else None
+                with open(partial_path, 'ab' if offset else 'wb') as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+            else:
+                return {'media_url': media_url, 'status': f"http {response.status_code}"}
+    except requests.RequestException as e:
+        # The partial file stays for the next run to resume
+        return {'media_url': media_url, 'status': f"error: {e}"}
+
+    size = os.path.getsize(partial_path)
+    if expected is not None and size != expected:
+        return {'media_url': media_url, 'status': f"incomplete ({size}/{expected} bytes)"}
+
+    # Content-addressed: objects/ab/abcdef...ext, identical files are stored once
+    sha256 = file_sha256(partial_path)
+    object_path = os.path.join(store_dir, 'objects', sha256[:2], sha256 + ext)
+    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+    if os.path.exists(object_path):
+        os.remove(partial_path)
+        status = 'duplicate'
+    else:
+        os.replace(partial_path, object_path)
+        status = 'ok'
+    return {'media_url': media_url, 'status': status, 'sha256': sha256, 'path': object_path, 'size': size}
+
+
+def load_manifest(store_dir=STORE_DIR):
+    """media url -> manifest entry for everything already stored"""
+    manifest = {}
+    path = os.path.join(store_dir, 'manifest.jsonl')
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                manifest[entry['media_url']] = entry
+    return manifest
+
+
+def verify_store(store_dir=STORE_DIR):
+    """Re-hash every stored object; returns the paths whose content no longer matches"""
+    bad = []
+    for entry in load_manifest(store_dir).values():
+        if not os.path.exists(entry['path']) or file_sha256(entry['path']) != entry['sha256']:
+            bad.append(entry['path'])
+    return bad
+
+
+def download_media(posts, store_dir=STORE_DIR, workers=8):
+    """Resolve media URLs, then download them in a process pool"""
+
+    async def resolve():
+        async with RedditClient(headers=HEADERS) as client:
+            return await resolve_media_async(client, posts)
+
+    media = asyncio.run(resolve())
+    # One download per media url, however many posts share it: two workers appending
+    # to the same partial/<sha1>.part would corrupt it
+    post_urls = {}
+    for post_url, media_url in media:
+        urls = post_urls.setdefault(media_url, [])
+        if post_url not in urls:
+            urls.append(post_url)
+    manifest = load_manifest(store_dir)
+    todo = [media_url for media_url in post_urls
+            if media_url not in manifest or not os.path.exists(manifest[media_url]['path'])]
+    print(f"🖼️  {len(post_urls)} media files found in {len(media)} post references, "
+          f"{len(post_urls) - len(todo)} already stored, {len(todo)} to download")
+
+    counts = {}
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, 'manifest.jsonl'), 'a', encoding='utf-8') as manifest_file, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(download_file, media_url, store_dir) for media_url in todo]
+        for future in as_completed(futures):
+            result = future.result()
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+            if 'sha256' in result:
+                result['post_urls'] = post_urls[result['media_url']]
+                manifest_file.write(json.dumps(result, ensure_ascii=False) + '\n')
+                manifest_file.flush()
+            else:
+                print(f"   {result['status']}: {result['media_url']}")
+    return counts
+
+
+if __name__ == "__main__":
+    print("=" * 100)
+    print("MEDIA DOWNLOADER")
+    print("=" * 100)
+
+    if '--verify' in sys.argv:
+        bad = verify_store()
+        print(f"{len(bad)} stored files failed hash verification")
+        for path in bad:
+            print(f"  ✗ {path}")
+        sys.exit(1 if bad else 0)
+
+    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+        posts = json.load(f)
+
+    counts = download_media(posts)
+    for status, count in sorted(counts.items(), key=lambda x: x[1], reverse=True):
+        print(f"  • {status}: {count}")
+    print(f"\n✓ Files stored in {STORE_DIR}/objects, manifest in {STORE_DIR}/manifest.jsonl")
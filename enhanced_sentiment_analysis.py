@@ -1,12 +1,14 @@
 import pandas as pd
 import numpy as np
-from transformers import pipeline
-from sentence_transformers import SentenceTransformer
 from collections import Counter
 import os
 import warnings
 warnings.filterwarnings('ignore')
 
+from model_server import SERVER_URL, ModelClient
+from roberta_inference import MultiHeadClassifier, drift_report, load_classifier
+from sentiment_cache import shared_cache
+
 print("=" * 100)
 print("ENHANCED SENTIMENT ANALYSIS WITH MODERN NLP MODELS")
 print("=" * 100)
@@ -20,6 +22,13 @@ print("⚠️  BERTopic skipped (requires C++ build tools). Using RoBERTa + Emot
 # Configuration
 csv_file = "dhaka_posts_20251119_224551.csv"
 output_dir = "enhanced_sentiment_analysis"
+BATCH_SIZE = 32             # texts per forward pass
+TORCH_THREADS = os.cpu_count()
+WINDOW_STRIDE = 128         # tokens shared by consecutive 512-token windows of a long body (None = first window only)
+WINDOW_AGGREGATE = "length_weighted"    # mean, length_weighted or max_negative
+BACKEND = "torch"           # "onnx" = int8-quantised ONNX Runtime, "onnx-fp32" = unquantised
+DRIFT_SAMPLE = 200          # with an ONNX backend, posts re-scored by PyTorch for the drift report
+MODEL_SERVER = SERVER_URL   # use a running `python model_server.py` when there is one (None = always load locally)
 os.makedirs(output_dir, exist_ok=True)
 
 # Load data
@@ -34,44 +43,65 @@ print("🔍 TRANSFORMER-BASED SENTIMENT ANALYSIS")
 print("-" * 100)
 print("Loading RoBERTa sentiment model (twitter-roberta-base-sentiment)...")
 
-sentiment_model = pipeline(
-    "sentiment-analysis",
-    model="cardiffnlp/twitter-roberta-base-sentiment",
-    device=-1  # Use CPU (use 0 for GPU if available)
-)
+SENTIMENT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment"
+EMOTION_MODEL = "j-hartmann/emotion-english-distilroberta-base"
 
-def analyze_sentiment(text):
-    """Analyze sentiment using RoBERTa"""
-    if not text or pd.isna(text):
-        return "neutral", 0.5
-    
-    text = str(text)[:512]  # Truncate long text
-    try:
-        result = sentiment_model(text)[0]
-        label = result['label'].lower()
-        score = result['score']
-        
-        # Normalize labels
-        if 'negative' in label:
-            return 'negative', score
-        elif 'positive' in label:
-            return 'positive', score
-        else:
-            return 'neutral', score
-    except:
-        return 'neutral', 0.5
-
-print("Analyzing sentiments of all posts...")
-sentiments = []
-scores = []
-
-for idx, text in enumerate(df['body']):
-    if idx % 50 == 0:
-        print(f"  Processing: {idx}/{len(df)} posts...", end='\r')
-    sentiment, score = analyze_sentiment(text)
-    sentiments.append(sentiment)
-    scores.append(score)
+# A warm model server skips importing torch/transformers and loading weights here
+server = ModelClient.connect(MODEL_SERVER) if MODEL_SERVER else None
+if server is not None:
+    print(f"✓ Using warm models from the model server at {MODEL_SERVER}")
+
+def get_model(name):
+    if server is not None:
+        return server.classifier(name)
+    return load_classifier(name, BACKEND, batch_size=BATCH_SIZE, threads=TORCH_THREADS)
+
+def predict_heads(heads, texts):
+    """[(labels, scores)] per head, from the model server or the local models"""
+    options = {'stride': WINDOW_STRIDE, 'aggregate': WINDOW_AGGREGATE}
+    if server is not None:
+        return server.predict([head.model_name for head in heads], texts, **options)
+    return MultiHeadClassifier(heads).predict(texts, progress=True, **options)
+
+sentiment_model = get_model(SENTIMENT_MODEL)
 
+print("Loading emotion classification model (distilroberta-base)...")
+try:
+    emotion_model = get_model(EMOTION_MODEL)
+except Exception as e:
+    print(f"⚠️  Emotion model failed: {e}")
+    emotion_model = None
+
+def cached_predictions(models, texts, empties):
+    """(labels, scores) per model for all texts; the models only see texts the sentiment cache lacks
+
+    Texts missing for one model also go through the models after it in the same
+    pass (shared tokenisation and batches, see MultiHeadClassifier); empty texts
+    get the model's `empties` entry without going through it.
+    """
+    shared = {}     # (model index, text) -> result of an earlier shared pass
+
+    def score_batch(index):
+        def score(batch):
+            todo = list(dict.fromkeys(text for text in batch if text and (index, text) not in shared))
+            if todo:
+                for offset, (labels, scores) in enumerate(predict_heads(models[index:], todo)):
+                    shared.update(((index + offset, text), [label, score]) for text, label, score in zip(todo, labels, scores))
+            return [shared.get((index, text), list(empties[index])) for text in batch]
+        return score
+
+    predictions = []
+    for index, model in enumerate(models):
+        version = f"{model.version}:{model.max_tokens}/{WINDOW_STRIDE}/{WINDOW_AGGREGATE}"
+        results = shared_cache().scores(model.model_name, version, texts, score_batch(index))
+        predictions.append(([label for label, _ in results], [score for _, score in results]))
+    return predictions
+
+print("Analyzing sentiments and emotions of all posts...")
+models = [sentiment_model] + ([emotion_model] if emotion_model is not None else [])
+predictions = cached_predictions(models, df['body'], empties=[("neutral", 0.5), ("neutral", 0.0)])
+
+sentiments, scores = predictions[0]
 df['roberta_sentiment'] = sentiments
 df['roberta_score'] = scores
 print(f"✓ Sentiment analysis complete ({len(df)} posts processed)\n")
@@ -79,51 +109,30 @@ print(f"✓ Sentiment analysis complete ({len(df)} posts processed)\n")
 # ===== 2. EMOTION DETECTION =====
 print("🎭 EMOTION DETECTION")
 print("-" * 100)
-print("Loading emotion classification model (distilroberta-base)...")
 
-try:
-    emotion_model = pipeline(
-        "text-classification",
-        model="j-hartmann/emotion-english-distilroberta-base",
-        return_all_scores=True,
-        device=-1
-    )
-    
-    def get_dominant_emotion(text):
-        """Detect dominant emotion"""
-        if not text or pd.isna(text):
-            return "neutral", 0.0
-        
-        text = str(text)[:512]
-        try:
-            results = emotion_model(text)
-            if results and len(results) > 0:
-                top_emotion = max(results[0], key=lambda x: x['score'])
-                return top_emotion['label'], top_emotion['score']
-            return "neutral", 0.0
-        except:
-            return "neutral", 0.0
-    
-    print("Detecting emotions in all posts...")
-    emotions = []
-    emotion_scores = []
-    
-    for idx, text in enumerate(df['body']):
-        if idx % 50 == 0:
-            print(f"  Processing: {idx}/{len(df)} posts...", end='\r')
-        emotion, score = get_dominant_emotion(text)
-        emotions.append(emotion)
-        emotion_scores.append(score)
-    
+if emotion_model is not None:
+    emotions, emotion_scores = predictions[1]
     df['emotion'] = emotions
     df['emotion_score'] = emotion_scores
     print(f"✓ Emotion detection complete ({len(df)} posts processed)\n")
-    
-except Exception as e:
-    print(f"⚠️  Emotion model failed: {e}")
+else:
     df['emotion'] = 'unknown'
     df['emotion_score'] = 0.0
 
+# ===== 2b. BACKEND ACCURACY DRIFT =====
+if BACKEND != "torch" and DRIFT_SAMPLE and server is None:
+    print(f"📐 {BACKEND.upper()} VS PYTORCH DRIFT")
+    print("-" * 100)
+    sample = [text for text in df['body'] if text][:DRIFT_SAMPLE]
+    reference = [load_classifier(model.model_name, "torch", batch_size=BATCH_SIZE, threads=TORCH_THREADS)
+                 for model in models]
+    drift_df = drift_report(reference, models, sample, stride=WINDOW_STRIDE, aggregate=WINDOW_AGGREGATE)
+    drift_df.to_csv(os.path.join(output_dir, "07_backend_drift.csv"), index=False)
+    for _, row in drift_df.iterrows():
+        print(f"  {row['model']}: {row['label_agreement']*100:.1f}% same labels, "
+              f"max prob diff {row['max_prob_diff']:.3f}, {row['speedup']:.1f}x faster")
+    print(f"✓ Saved to {output_dir}/07_backend_drift.csv\n")
+
 # ===== 3. TOPIC MODELING WITH BERTopic =====
 if bertopic_available:
     print("🏷️  SEMANTIC TOPIC MODELING WITH BERTopic")
@@ -131,6 +140,7 @@ if bertopic_available:
     print("Loading sentence transformer model (all-MiniLM-L6-v2)...")
     
     try:
+        from sentence_transformers import SentenceTransformer
         embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
         print("Creating topic model...")
         
@@ -1,7 +1,8 @@
 import pandas as pd
-import re
 from datetime import datetime
 
+from dhaka_gazetteer import DHAKA_LABELS, dhaka_matcher
+
 SRC = 'dhaka_posts_20251119_224551.csv'
 OUT_ALL = 'dhaka_people_posts_combined.csv'
 OUT_BREAKDOWN = 'dhaka_people_posts_breakdown.csv'
@@ -18,33 +19,13 @@ print(f"Loaded {len(df)} rows from {SRC}")
 def norm(s):
     return str(s).lower()
 
-# Dhaka area keywords (from your list)
-areas = [
-    # City corporations
-    'dncc','dscc','dhaka north city corporation','dhaka south city corporation',
-    # Major areas (DNCC)
-    'uttara','mirpur','pallabi','airport','shahjalal','mohammadpur','dhanmondi','shyamoli','tejgaon',
-    'turag','banani','gulshan','badda','khilgaon','shantinagar','kallyanpur','gabtoli','agargaon',
-    # Major areas (DSCC)
-    'old dhaka','puran dhaka','sadarghat','lalbagh','kotwali','kamrangirchar','motijheel','ramna',
-    'baridhara','jatrabari','paltan','banasree','demra','wari',
-    # Other notable
-    'uttarkhan','bashundhara','mohakhali','rampura','khilkhet','niketon','kafrul'
-]
-
-# Build regex pattern (word-boundary match, allow hyphens/spaces)
-# Escape special chars and join
-kw_parts = []
-for a in areas + ['dhaka']:
-    a = a.strip().lower()
-    a = re.sub(r"\s+", r"[\s-]", re.escape(a))  # spaces/hyphens interchangeable
-    kw_parts.append(fr"\b{a}\b")
-pattern = re.compile('|'.join(kw_parts))
+# Dhaka areas, city corporations and 'dhaka' itself (Bengali spellings and
+# hyphen/space variants included) come from the shared gazetteer
 
 # Classify posts
 is_dhaka_sub = (df['subreddit'].str.lower() == 'dhaka')
-text = (df['title'].astype(str).str.lower() + ' ' + df['body'].astype(str).str.lower())
-has_area_mention = text.str.contains(pattern, regex=True, na=False)
+text = df['title'].astype(str) + ' ' + df['body'].astype(str)
+has_area_mention = text.map(lambda t: bool(dhaka_matcher.labels(t, only=DHAKA_LABELS)))
 
 mask = is_dhaka_sub | has_area_mention
 filtered = df[mask].copy()
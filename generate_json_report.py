@@ -4,23 +4,39 @@ from collections import Counter
 from datetime import datetime
 import re
 import os
+import sys
+
+from post_store import STORE_FILE, PostStore
 
 INPUT_FILE = 'e:/Reddit/final_dhaka_dataset.json'
 OUTPUT_FILE = 'e:/Reddit/combined_dhaka_overview.html'
+# 'json' reads INPUT_FILE, 'store' reads the post store (STORE_FILE); `--store` on the command line
+DATA_SOURCE = 'json'
 
-def generate_report():
-    if not os.path.exists(INPUT_FILE):
+def generate_report(source=DATA_SOURCE):
+    if source == 'store':
+        if not os.path.exists(STORE_FILE):
+            print(f"Error: {STORE_FILE} not found.")
+            return
+        # Everything the crawlers have upserted, with the latest upvote/comment counts
+        print(f"Reading {STORE_FILE}...")
+        store = PostStore()
+        df = store.query(
+            "SELECT title, body, url, author, upvotes, comments, created_utc, subreddit, permalink FROM posts"
+        )
+        store.close()
+        df['date'] = pd.to_datetime(df.pop('created_utc'), unit='s')
+    elif os.path.exists(INPUT_FILE):
+        print(f"Reading {INPUT_FILE}...")
+        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        df = pd.DataFrame(data)
+        
+        # Convert date
+        df['date'] = pd.to_datetime(df['date'])
+    else:
         print(f"Error: {INPUT_FILE} not found.")
         return
-
-    print(f"Reading {INPUT_FILE}...")
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    df = pd.DataFrame(data)
-    
-    # Convert date
-    df['date'] = pd.to_datetime(df['date'])
     
     # Basic Stats
     total_posts = len(df)
@@ -279,4 +295,4 @@ def generate_report():
     print(f"Successfully generated report at: {OUTPUT_FILE}")
 
 if __name__ == '__main__':
-    generate_report()
+    generate_report('store' if '--store' in sys.argv else DATA_SOURCE)
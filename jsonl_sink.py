@@ -0,0 +1,164 @@
+import glob
+import gzip
+import io
+import json
+import os
+
+# ------------------------------
+# Streaming JSONL output for crawlers: one post per line, written as it is fetched
+# ------------------------------
+EXTENSIONS = {None: '.jsonl', 'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression needs the 'zstandard' package (pip install zstandard)")
+    return zstandard
+
+
+def sink_parts(base):
+    """Existing part files of a sink, in order"""
+    parts = []
+    for ext in EXTENSIONS.values():
+        parts.extend(glob.glob(f"{glob.escape(base)}-[0-9][0-9][0-9][0-9]{ext}"))
+    return sorted(parts)
+
+
+class JsonlSink:
+    """Append-only, rotating, optionally gzip/zstd-compressed JSONL writer
+
+    Records go to {base}-0000.jsonl, {base}-0001.jsonl, ... and a new part starts
+    once the current one holds rotate_bytes of uncompressed JSON. flush() is meant
+    to be called after every page, so a crash loses at most the page in flight.
+    With append=False any parts from an earlier run are removed first.
+    """
+
+    def __init__(self, base, compression=None, rotate_bytes=64 * 1024 * 1024, append=False):
+        if compression not in EXTENSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        self.base = base
+        self.compression = compression
+        self.rotate_bytes = rotate_bytes
+        self.records = 0
+
+        directory = os.path.dirname(base)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        existing = sink_parts(base)
+        if not append:
+            for path in existing:
+                os.remove(path)
+            existing = []
+        # Compressed parts cannot be reopened for appending, so every run starts a new part
+        self.part = len(existing)
+        self.file = None
+        self._open_part()
+
+    def _open_part(self):
+        self.path = f"{self.base}-{self.part:04d}{EXTENSIONS[self.compression]}"
+        self.part_bytes = 0
+        if self.compression == 'gzip':
+            # One gzip member per flushed batch, so a crash leaves only complete members
+            self.raw = open(self.path, 'wb')
+            self.file = gzip.GzipFile(fileobj=self.raw, mode='wb')
+        elif self.compression == 'zstd':
+            self.raw = open(self.path, 'wb')
+            self.file = _zstd().ZstdCompressor().stream_writer(self.raw)
+        else:
+            self.raw = None
+            self.file = open(self.path, 'wb')
+
+    def _close_part(self):
+        if self.file is not None:
+            self.file.close()
+        if self.raw is not None and not self.raw.closed:
+            self.raw.close()
+
+    def write(self, record):
+        line = (json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+        if self.part_bytes and self.part_bytes + len(line) > self.rotate_bytes:
+            self._close_part()
+            self.part += 1
+            self._open_part()
+        if self.file is None:
+            self.file = gzip.GzipFile(fileobj=self.raw, mode='wb')
+        self.file.write(line)
+        self.part_bytes += len(line)
+        self.records += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        """Make everything written so far readable after a crash"""
+        if self.compression == 'zstd':
+            # End the zstd frame; concatenated frames read back as one stream
+            self.file.flush(_zstd().FLUSH_FRAME)
+            self.raw.flush()
+            os.fsync(self.raw.fileno())
+        elif self.compression == 'gzip':
+            # End the gzip member; the next write starts a new one
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.raw.flush()
+            os.fsync(self.raw.fileno())
+        else:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        self.flush()
+        self._close_part()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _open_part(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.zst'):
+        return io.TextIOWrapper(_zstd().ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True),
+                                encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def read_jsonl(paths):
+    """Yield records from JSONL files (plain, .gz or .zst); a torn last line is skipped
+
+    A compressed part cut off mid-stream by a crash yields the lines decoded before
+    the truncation.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    truncated = (EOFError,)
+    for path in paths:
+        if path.endswith('.zst'):
+            truncated = (EOFError, _zstd().ZstdError)
+        with _open_part(path) as f:
+            lines = iter(f)
+            while True:
+                try:
+                    line = next(lines)
+                except StopIteration:
+                    break
+                except truncated:
+                    print(f"   {path} ends mid-stream; keeping the records before the cut")
+                    break
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def read_sink(base):
+    """Yield every record written to a sink, across all parts"""
+    return read_jsonl(sink_parts(base))
@@ -0,0 +1,184 @@
+import json
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from listing_filters import AreaFilter, LocationPhraseFilter
+from reddit_client import crawl_listings, new_listing_job
+from response_cache import ResponseCache
+
+# ------------------------------
+# Shared single-pass crawl of /r/{sub}/new feeding every location filter
+# ------------------------------
+RAW_LISTING_FILE = "raw_listing/new_listing.jsonl"
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+
+
+class ListingStore:
+    """Raw listing file that doubles as the crawl's checkpoint
+
+    Children are stored one per line as {'subreddit', 'data'}; after each page a
+    cursor line {'subreddit', 'after', 'fetched', 'end'} records where that
+    subreddit's crawl stopped, with `end` set once the listing itself ran out.
+    Implements the CrawlCheckpoint interface used by crawl_listings.
+    """
+
+    def __init__(self, path, filters=()):
+        self.path = path
+        self.filters = list(filters)
+        self.pages = {}     # subreddit -> stored children
+        self.cursors = {}   # subreddit -> last cursor line
+        self.file = None
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        pending = {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if 'data' in row:
+                    pending.setdefault(row['subreddit'], []).append({'data': row['data']})
+                else:
+                    self.pages.setdefault(row['subreddit'], []).extend(pending.pop(row['subreddit'], []))
+                    self.cursors[row['subreddit']] = row
+        # Children after a subreddit's last cursor belong to a page cut off mid-write; it is refetched
+
+    def open(self):
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+    def satisfied(self, subreddit):
+        """True once every filter is full for a subreddit"""
+        return bool(self.filters) and all(listing_filter.full(subreddit) for listing_filter in self.filters)
+
+    def state(self, job):
+        """(after, fetched, done): done once the listing ended or no filter wants more posts"""
+        cursor = self.cursors.get(job.key)
+        if cursor is None:
+            return None, 0, self.satisfied(job.key)
+        return cursor['after'], cursor['fetched'], cursor['end'] or self.satisfied(job.key)
+
+    def replay(self, jobs):
+        for job in jobs:
+            if self.pages.get(job.key):
+                yield job, self.pages[job.key]
+
+    def _write_cursor(self, subreddit, after, fetched, end):
+        cursor = {'subreddit': subreddit, 'after': after, 'fetched': fetched, 'end': end}
+        self.file.write(json.dumps(cursor) + '\n')
+        self.file.flush()
+        self.cursors[subreddit] = cursor
+
+    def record_page(self, job, children, after, fetched, done=False):
+        for child in children:
+            post_data = child.get('data', {})
+            self.file.write(json.dumps({'subreddit': job.key, 'data': post_data}, ensure_ascii=False) + '\n')
+        self.pages.setdefault(job.key, []).extend(children)
+        self._write_cursor(job.key, after, fetched, after is None)
+
+    def mark_failed(self, job):
+        # Nothing to record: the job's last cursor is where the next crawl picks up
+        pass
+
+    def mark_done(self, job):
+        """A job that stopped cleanly while filters still wanted posts hit the end of the listing"""
+        cursor = self.cursors.get(job.key)
+        if cursor is None or cursor['end'] or self.satisfied(job.key):
+            return
+        if job.max_items is not None and cursor['fetched'] >= job.max_items:
+            return
+        self._write_cursor(job.key, cursor['after'], cursor['fetched'], True)
+
+
+def crawl_listing(subreddits, filters, store_path=RAW_LISTING_FILE, max_items=None, cache_ttl_hours=6,
+                  resume=False):
+    """Download each listing page once, store the raw children and feed them to every filter
+
+    A subreddit stops paginating once every filter is full for it, and the store
+    records the `after` cursor it stopped at. With resume=True the stored pages are
+    replayed into the filters first and each subreddit whose listing has not ended
+    continues from that cursor while any filter still wants posts.
+    """
+    directory = os.path.dirname(store_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    resumed = resume and os.path.exists(store_path)
+    if resumed:
+        crawled_at = os.path.getmtime(store_path)
+        store = ListingStore(store_path, filters)
+    else:
+        tmp_path = store_path + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        store = ListingStore(tmp_path, filters)
+    store.open()
+
+    def handle_page(job, children):
+        for child in children:
+            post_data = child.get('data', {})
+            for listing_filter in filters:
+                listing_filter.consume(job.key, post_data)
+        return not store.satisfied(job.key)
+
+    try:
+        jobs = [new_listing_job(subreddit, max_items=max_items) for subreddit in subreddits]
+        cache = ResponseCache(ttl=cache_ttl_hours * 3600) if cache_ttl_hours else None
+        crawl_listings(jobs, handle_page, checkpoint=store, headers=HEADERS, cache=cache)
+    finally:
+        store.close()
+
+    if resumed:
+        # Appended pages do not make the listing's first pages any younger
+        os.utime(store_path, (time.time(), crawled_at))
+    else:
+        # Only a finished crawl replaces the previous store
+        os.replace(tmp_path, store_path)
+
+
+def replay_listing(filters, store_path=RAW_LISTING_FILE, subreddits=None):
+    """Run filters over a stored listing without touching the network"""
+    for subreddit, children in ListingStore(store_path).pages.items():
+        if subreddits is not None and subreddit not in subreddits:
+            continue
+        for child in children:
+            for listing_filter in filters:
+                listing_filter.consume(subreddit, child['data'])
+
+
+def shared_listing(subreddits, filters, store_path=RAW_LISTING_FILE, max_age_hours=6):
+    """Reuse the stored listing if it is recent enough (crawling on where filters need more), else crawl it"""
+    if os.path.exists(store_path) and time.time() - os.path.getmtime(store_path) < max_age_hours * 3600:
+        print(f"📦 Reusing listing stored in {store_path}")
+        crawl_listing(subreddits, filters, store_path, resume=True)
+    else:
+        print(f"🔍 Crawling {', '.join('r/' + s for s in subreddits)} once for {len(filters)} filters...")
+        crawl_listing(subreddits, filters, store_path)
+
+
+if __name__ == "__main__":
+    # One pass over the listing produces the outputs of both location crawlers
+    subreddits = ['dhaka', 'bangladesh']
+    area_filter = AreaFilter(max_posts=500)
+    location_filter = LocationPhraseFilter(max_posts=300)
+    crawl_listing(subreddits, [area_filter, location_filter])
+
+    if area_filter.posts:
+        pd.DataFrame(area_filter.posts).to_csv("dhaka_area_specific_posts.csv", index=False, encoding='utf-8')
+        print(f"\n✓ Saved {len(area_filter.posts)} area posts to: dhaka_area_specific_posts.csv")
+
+    if location_filter.posts:
+        filename = f"location_based_posts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        pd.DataFrame(location_filter.posts).to_csv(filename, index=False, encoding='utf-8')
+        print(f"✓ Saved {len(location_filter.posts)} location posts to: {filename}")
+
+    print(f"✓ Raw listing stored in: {RAW_LISTING_FILE}")
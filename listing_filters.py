@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from dhaka_gazetteer import AREA_LABELS, AREAS, dhaka_matcher
+
+# ------------------------------
+# Filters that consume the shared /r/{sub}/new listing stream (see listing_crawl.py)
+# ------------------------------
+
+# Area hierarchy, coordinates and spellings live in dhaka_gazetteer.py
+all_dhaka_keywords = [area.name for area in AREAS]
+
+# Dhaka places whose mention suggests a poster living in Dhaka
+# ('i am in dhaka', 'based in dhaka', ... all contain the Dhaka match)
+dhaka_location_keywords = {
+    'Dhaka', 'Old Dhaka', 'DNCC', 'DSCC',
+    'Gulshan', 'Banani', 'Dhanmondi', 'Mirpur', 'Baridhara', 'Uttara', 'Motijheel', 'Kawran Bazar',
+    'Badda', 'Bashundhara', 'Pallabi', 'Mohakhali'
+}
+
+
+class ListingFilter:
+    """Consumer of the shared listing stream; keeps up to max_posts matches per subreddit"""
+
+    def __init__(self, max_posts=None):
+        self.max_posts = max_posts
+        self.posts = []
+        self.collected = {}
+
+    def full(self, subreddit):
+        return self.max_posts is not None and self.collected.get(subreddit, 0) >= self.max_posts
+
+    def match(self, subreddit, post_data):
+        """Return the output row for a matching post, or None"""
+        raise NotImplementedError
+
+    def consume(self, subreddit, post_data):
+        if self.full(subreddit):
+            return
+        entry = self.match(subreddit, post_data)
+        if entry is not None:
+            self.posts.append(entry)
+            self.collected[subreddit] = self.collected.get(subreddit, 0) + 1
+
+
+class AreaFilter(ListingFilter):
+    """Posts that mention one or more Dhaka areas (crawl_by_dhaka_areas.py)"""
+
+    def __init__(self, max_posts=None):
+        super().__init__(max_posts)
+        self.posts_by_area = {}
+
+    def match(self, subreddit, post_data):
+        author = post_data.get('author')
+        full_text = str(post_data.get('title', '')) + " " + str(post_data.get('selftext', ''))
+
+        # Find which areas are mentioned, in one pass over the text
+        mentioned_areas = dhaka_matcher.labels(full_text, only=AREA_LABELS)
+
+        if not mentioned_areas:
+            return None
+
+        # Track by area
+        for area in mentioned_areas:
+            if area not in self.posts_by_area:
+                self.posts_by_area[area] = 0
+            self.posts_by_area[area] += 1
+
+        if len(mentioned_areas) > 1:
+            print(f"   ✓ [{', '.join(mentioned_areas)}] {post_data.get('title', '')[:60]}...")
+        else:
+            print(f"   ✓ [{mentioned_areas[0]}] {post_data.get('title', '')[:60]}...")
+
+        return {
+            'title': post_data.get('title', ''),
+            'author': author,
+            'subreddit': subreddit,
+            'upvotes': post_data.get('score', 0),
+            'comments': post_data.get('num_comments', 0),
+            'created': datetime.fromtimestamp(post_data.get('created_utc', 0)),
+            'url': f"https://reddit.com{post_data.get('permalink', '')}",
+            'areas_mentioned': ', '.join(mentioned_areas),
+            'area_count': len(mentioned_areas),
+            'content_preview': (post_data.get('selftext', '')[:150] or post_data.get('title', '')[:150])
+        }
+
+
+class LocationPhraseFilter(ListingFilter):
+    """Posts whose text places the author in Dhaka (crawl_by_user_location.py)"""
+
+    def match(self, subreddit, post_data):
+        author = post_data.get('author')
+        if not author or author == '[deleted]':
+            return None
+
+        # Reddit API doesn't expose location directly in posts,
+        # so look for location mentions in post title/content
+        full_text = str(post_data.get('title', '')) + " " + str(post_data.get('selftext', ''))
+
+        if not dhaka_matcher.labels(full_text, only=dhaka_location_keywords):
+            return None
+
+        print(f"   ✓ Found: {post_data.get('title', '')[:60]}...")
+
+        return {
+            'title': post_data.get('title', ''),
+            'author': author,
+            'subreddit': subreddit,
+            'upvotes': post_data.get('score', 0),
+            'comments': post_data.get('num_comments', 0),
+            'created': datetime.fromtimestamp(post_data.get('created_utc', 0)),
+            'url': f"https://reddit.com{post_data.get('permalink', '')}",
+            'content_preview': (post_data.get('selftext', '')[:200] or post_data.get('title', '')[:200]),
+            'location_indicator': 'Location mentioned in post'
+        }
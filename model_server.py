@@ -0,0 +1,196 @@
+import json
+import queue
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+# ------------------------------
+# Local model server: keeps the transformer classifiers loaded between analysis runs
+# ------------------------------
+# python model_server.py [torch|onnx|onnx-fp32]   (clients: ModelClient.connect())
+HOST = "127.0.0.1"
+PORT = 8765
+SERVER_URL = f"http://{HOST}:{PORT}"
+BACKEND = "torch"
+BATCH_SIZE = 32
+THREADS = None              # torch / ONNX Runtime intra-op threads (None = library default)
+BATCH_WAIT = 0.02           # seconds a request waits for others to join its batch
+PRELOAD = ["cardiffnlp/twitter-roberta-base-sentiment", "j-hartmann/emotion-english-distilroberta-base"]
+
+
+class ModelServer:
+    """Loaded classifiers plus one worker thread that batches requests across clients
+
+    Requests for the same models and window settings that arrive within
+    BATCH_WAIT of each other are concatenated into one MultiHeadClassifier pass
+    and the results split back per request.
+    """
+
+    def __init__(self, backend=BACKEND, batch_size=BATCH_SIZE, threads=THREADS):
+        # Heavy imports happen here, once per server process
+        from roberta_inference import MultiHeadClassifier, load_classifier
+        self.multi_head = MultiHeadClassifier
+        self.load_classifier = load_classifier
+        self.backend = backend
+        self.options = {'batch_size': batch_size, 'threads': threads}
+        self.models = {}
+        self.lock = threading.Lock()
+        self.jobs = queue.Queue()
+        threading.Thread(target=self._work, daemon=True).start()
+
+    def model(self, name):
+        with self.lock:
+            if name not in self.models:
+                print(f"📦 Loading {name} ({self.backend})...")
+                self.models[name] = self.load_classifier(name, self.backend, **self.options)
+            return self.models[name]
+
+    def info(self, name):
+        model = self.model(name)
+        return {'model': name, 'version': model.version, 'labels': model.labels,
+                'max_tokens': model.max_tokens, 'backend': self.backend}
+
+    def predict(self, names, texts, stride=None, aggregate='mean'):
+        """[(labels, scores)] per model, computed by the worker together with concurrent requests"""
+        job = {'key': (tuple(names), stride, aggregate), 'texts': texts, 'done': threading.Event()}
+        self.jobs.put(job)
+        job['done'].wait()
+        if 'error' in job:
+            raise job['error']
+        return job['result']
+
+    def _work(self):
+        while True:
+            jobs = [self.jobs.get()]
+            deadline = time.time() + BATCH_WAIT
+            while True:
+                try:
+                    jobs.append(self.jobs.get(timeout=max(deadline - time.time(), 0)))
+                except queue.Empty:
+                    break
+            batches = {}
+            for job in jobs:
+                batches.setdefault(job['key'], []).append(job)
+            for (names, stride, aggregate), group in batches.items():
+                self._run(names, stride, aggregate, group)
+
+    def _run(self, names, stride, aggregate, jobs):
+        try:
+            texts = [text for job in jobs for text in job['texts']]
+            heads = self.multi_head([self.model(name) for name in names])
+            outputs = heads.predict(texts, stride=stride, aggregate=aggregate)
+            start = 0
+            for job in jobs:
+                end = start + len(job['texts'])
+                job['result'] = [(labels[start:end], scores[start:end]) for labels, scores in outputs]
+                start = end
+        except Exception as e:
+            for job in jobs:
+                job['error'] = e
+        for job in jobs:
+            job['done'].set()
+
+
+class ModelRequestHandler(BaseHTTPRequestHandler):
+    server_version = "DhakaModelServer/1.0"
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._reply(200, {'backend': self.server.models.backend, 'loaded': sorted(self.server.models.models)})
+        else:
+            self._reply(404, {'error': f"unknown path {self.path}"})
+
+    def do_POST(self):
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if self.path == '/info':
+                self._reply(200, self.server.models.info(request['model']))
+            elif self.path == '/predict':
+                predictions = self.server.models.predict(
+                    request['models'], request['texts'], request.get('stride'), request.get('aggregate', 'mean')
+                )
+                self._reply(200, {'predictions': predictions})
+            else:
+                self._reply(404, {'error': f"unknown path {self.path}"})
+        except Exception as e:
+            self._reply(500, {'error': f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RemoteClassifier:
+    """Stand-in for a BatchedClassifier that lives in the model server"""
+
+    def __init__(self, client, info):
+        self.client = client
+        self.model_name = info['model']
+        self.version = info['version']
+        self.labels = info['labels']
+        self.max_tokens = info['max_tokens']
+
+
+class ModelClient:
+    """JSON-over-HTTP client of a running model server"""
+
+    def __init__(self, url=SERVER_URL, timeout=3600):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    @classmethod
+    def connect(cls, url=SERVER_URL):
+        """Client for the server at `url`, or None when none is running"""
+        client = cls(url)
+        try:
+            client._call('GET', '/health', timeout=1)
+        except (URLError, OSError):
+            return None
+        return client
+
+    def _call(self, method, path, payload=None, timeout=None):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = Request(self.url + path, data=data, method=method, headers={'Content-Type': 'application/json'})
+        with urlopen(request, timeout=timeout or self.timeout) as response:
+            return json.loads(response.read())
+
+    def classifier(self, name):
+        """RemoteClassifier for `name`; the server loads the model if it has not yet"""
+        return RemoteClassifier(self, self._call('POST', '/info', {'model': name}))
+
+    def predict(self, names, texts, stride=None, aggregate='mean'):
+        """[(labels, scores)] per model, like MultiHeadClassifier.predict"""
+        reply = self._call('POST', '/predict', {'models': list(names), 'texts': list(texts),
+                                                'stride': stride, 'aggregate': aggregate})
+        return [tuple(prediction) for prediction in reply['predictions']]
+
+
+def serve(backend=BACKEND, host=HOST, port=PORT, preload=PRELOAD):
+    httpd = ThreadingHTTPServer((host, port), ModelRequestHandler)
+    httpd.models = ModelServer(backend)
+    for name in preload:
+        try:
+            httpd.models.model(name)
+        except Exception as e:
+            print(f"⚠️  {name} failed to load: {e}")
+    print(f"✓ Model server ready on http://{host}:{port} ({backend}, {len(httpd.models.models)} models warm)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1] if len(sys.argv) > 1 else BACKEND)
@@ -0,0 +1,432 @@
+import re
+from importlib.metadata import version
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+from textblob import _text as pattern
+from textblob.en import sentiment as PATTERN_LEXICON
+
+from sentiment_cache import shared_cache
+
+# ------------------------------
+# Batch scorer equivalent to TextBlob(text).sentiment (pattern lexicon)
+# ------------------------------
+QUOTES = [('“', ' “ '), ('”', ' ” '), ('‘', ' ‘ '), ('’', ' ’ '), ("'", " ' "), ('"', ' " ')]
+LINEBREAK = re.compile(r'\n\n+')
+# Texts are tokenised as one string, separated by a private-use character
+DOC_MARK = '\ue000'
+DOC_SEPARATOR = f' {DOC_MARK} '
+
+# Key of this scorer's results in the sentiment cache
+MODEL_NAME = 'textblob-pattern'
+MODEL_VERSION = version('textblob')
+
+SPLIT_PUNCTUATION = tuple(pattern.PUNCTUATION.replace('.', ''))
+SENTENCE_END = ('...', '.', '!', '?', pattern.EOS)
+SENTENCE_TAIL = ("'", '"', '”', '’', '...', '.', '!', '?', ')', pattern.EOS)
+NEGATIONS = set(PATTERN_LEXICON.negations)
+
+# Scan state before each token: modifier (0 none, 1 adverb, 2 adverb ending in -ly) x pending negation
+STATES = [(m, n) for m in range(3) for n in range(2)]
+
+
+def _split_chunk(chunk):
+    """Split leading/trailing punctuation off one whitespace-separated chunk (pattern.find_tokens rules)"""
+    tokens = []
+    tail = []
+    t = chunk
+    while t.startswith(SPLIT_PUNCTUATION) and t not in pattern.replacements:
+        tokens.append(t[0])
+        t = t[1:]
+    while t.endswith(SPLIT_PUNCTUATION + ('.',)) and t not in pattern.replacements:
+        if t.endswith(SPLIT_PUNCTUATION):
+            tail.append(t[-1])
+            t = t[:-1]
+        if t.endswith('...'):
+            tail.append('...')
+            t = t[:-3].rstrip('.')
+        if t.endswith('.'):
+            if (t in pattern.ABBREVIATIONS or pattern.RE_ABBR1.match(t) is not None
+                    or pattern.RE_ABBR2.match(t) is not None or pattern.RE_ABBR3.match(t) is not None):
+                break
+            tail.append(t[-1])
+            t = t[:-1]
+    if t != '':
+        tokens.append(t)
+    tokens.extend(reversed(tail))
+    return tokens
+
+
+def _sentences(tokens):
+    """Sentence split of pattern.find_tokens over already split tokens"""
+    sentences, i, j = [[]], 0, 0
+    while j < len(tokens):
+        if tokens[j] in SENTENCE_END:
+            # Citations, trailing parenthesis, repeated punctuation (!?)
+            while j < len(tokens) and tokens[j] in SENTENCE_TAIL:
+                if tokens[j] in ("'", '"') and sentences[-1].count(tokens[j]) % 2 == 0:
+                    break
+                j += 1
+            sentences[-1].extend(t for t in tokens[i:j] if t != pattern.EOS)
+            sentences.append([])
+            i = j
+        j += 1
+    sentences[-1].extend(tokens[i:j])
+    return [' '.join(s) for s in sentences if len(s) > 0]
+
+
+def _join_emoticons(sentence):
+    sentence = pattern.RE_SARCASM.sub('(!)', sentence)
+    return pattern.RE_EMOTICONS.sub(lambda m: m.group(1).replace(' ', '') + m.group(2), sentence)
+
+
+def _rewrite(text):
+    """Split off contractions and quotes, mark paragraph breaks (pattern.find_tokens)
+
+    pattern puts a space before every contraction in pattern.replacements, but the
+    straight quote gets spaced anyway, so only "n't" -> " n't" changes the tokens.
+    """
+    text = text.replace("n't", " n't")
+    for quote, spaced in QUOTES:
+        text = text.replace(quote, spaced)
+    return LINEBREAK.sub(f' {pattern.EOS} ', text.replace('\r\n', '\n'))
+
+
+def _spaced_emoticon(text):
+    """Whether pattern would join an emoticon or (!) written with spaces in `text`"""
+    return (any(' ' in m.group(0) for m in pattern.RE_SARCASM.finditer(text))
+            or any(' ' in m.group(1) for m in pattern.RE_EMOTICONS.finditer(text)))
+
+
+def _emoticon_pieces():
+    """Index the (preceding character, piece) pairs a space may split an emoticon into"""
+    faces = [face for group in pattern.EMOTICONS.values() for face in group] + ['(!)']
+    splits = {(face[a - 1], face[a:b]) for face in faces for a in range(1, len(face)) for b in range(a + 1, len(face) + 1)}
+    tails = {char: index for index, char in enumerate(sorted({char for char, _ in splits}))}
+    pieces = {piece: index for index, piece in enumerate(sorted({piece for _, piece in splits}))}
+    table = np.zeros((len(tails), len(pieces)), dtype=bool)
+    for char, piece in splits:
+        table[tails[char], pieces[piece]] = True
+    return tails, pieces, table
+
+
+def _emoticon_polarity(word):
+    if word.isalpha() is False and len(word) <= 5 and word not in pattern.PUNCTUATION:
+        for (_, polarity), faces in pattern.EMOTICONS.items():
+            if word in map(str.lower, faces):
+                return polarity
+    return None
+
+
+TAILS, PIECES, PIECE_AFTER = _emoticon_pieces()
+
+
+class PatternScorer:
+    """Polarity/subjectivity for whole columns of text, numerically identical to TextBlob
+
+    The pattern lexicon is flattened once into per-token arrays (polarity,
+    subjectivity, intensity, adverb/negation flags). A batch is tokenised into one
+    array of token ids; the negation/intensifier state before every token is
+    resolved with a pointer-jumping scan over per-token state transitions, and
+    the assessments are then built and averaged with array operations.
+    """
+
+    def __init__(self):
+        len(PATTERN_LEXICON)  # lazydict: load en-sentiment.xml now
+        self.vocab = {}
+        self.features = []
+        self.token_arrays = None
+        # Chunk 0 is the separator between texts
+        self.chunk_index = {DOC_MARK: 0}
+        self.chunks = [((), '', False, -1, -1)]
+        self.chunk_arrays = None
+
+    # ---- lexicon table ----
+
+    def _token_id(self, token):
+        word = token.lower()
+        index = self.vocab.get(word)
+        if index is None:
+            index = self.vocab[word] = len(self.features)
+            self.features.append(self._features(word))
+            self.token_arrays = None
+        return index
+
+    def _features(self, word):
+        senses = dict.get(PATTERN_LEXICON, word)
+        if senses is not None:
+            p, s, i = senses[None]
+            adverb = any(pos in senses for pos in PATTERN_LEXICON.modifiers)
+            modifier = (2 if word.endswith('ly') else 1) if adverb else 0
+            transition = [modifier * 2 + (word in NEGATIONS)] * len(STATES)
+            return (True, p, s, i, transition, [False] * len(STATES), False, False)
+
+        negation = word in NEGATIONS
+        transition = []
+        absorbs = []
+        for m, n in STATES:
+            pending = negation or bool(n and len(word.strip("'")) <= 1)
+            absorb = pending and m == 2
+            if absorb:
+                pending = False
+            elif m and len(word) > 2:
+                m = 0
+            transition.append(m * 2 + pending)
+            absorbs.append(absorb)
+        emoticon = _emoticon_polarity(word)
+        creates = word == '(!)' or emoticon is not None
+        return (False, emoticon or 0.0, 1.0, 1.0, transition, absorbs, word == '!', creates)
+
+    def _token_tables(self):
+        if self.token_arrays is None:
+            known, p, s, i, transition, absorbs, bang, creates = zip(*self.features)
+            transition = np.array(transition, dtype=np.int8)
+            self.token_arrays = {
+                'known': np.array(known),
+                'p': np.array(p, dtype=float),
+                's': np.array(s, dtype=float),
+                'i': np.array(i, dtype=float),
+                'transition': transition,
+                # the state after a token, when it does not depend on the state before
+                'fixed': np.where((transition == transition[:, :1]).all(axis=1), transition[:, 0], -1),
+                'absorbs': np.array(absorbs, dtype=bool),
+                'bang': np.array(bang),
+                'creates': np.array(creates),
+            }
+        return self.token_arrays
+
+    # ---- tokenising ----
+
+    def _chunk_id(self, chunk):
+        """Index of a whitespace-separated chunk in the chunk table, adding it on first sight
+
+        Each chunk row holds its token ids, its space-joined tokens and emoticon hints:
+        whether its own tokens hold a spaced-out emoticon, which emoticon piece its
+        first token could be and which emoticon character it ends with.
+        """
+        index = self.chunk_index.get(chunk)
+        if index is None:
+            tokens = [token for token in _split_chunk(chunk) if token != pattern.EOS]
+            joined = ' '.join(tokens)
+            index = self.chunk_index[chunk] = len(self.chunks)
+            self.chunks.append((
+                tuple(self._token_id(token) for token in tokens),
+                joined,
+                _spaced_emoticon(joined),
+                PIECES.get(tokens[0], -1) if tokens else -1,
+                TAILS.get(joined[-1], -1) if tokens else -1,
+            ))
+            self.chunk_arrays = None
+        return index
+
+    def _chunk_tables(self):
+        if self.chunk_arrays is None:
+            ids, joined, inner, head, tail = zip(*self.chunks)
+            lengths = np.array([len(chunk_ids) for chunk_ids in ids], dtype=np.int64)
+            self.chunk_arrays = {
+                'lengths': lengths,
+                'offsets': np.cumsum(lengths) - lengths,
+                'ids': np.fromiter((i for chunk_ids in ids for i in chunk_ids), dtype=np.int64, count=lengths.sum()),
+                'joined': np.array(joined, dtype=object),
+                'inner': np.array(inner),
+                'head': np.array(head),
+                'tail': np.array(tail),
+            }
+        return self.chunk_arrays
+
+    def _sentence_ids(self, text):
+        """Token ids of one text, split into sentences first as pattern does"""
+        tokens = []
+        for chunk in _rewrite(text).split():
+            tokens.extend(_split_chunk(chunk) if pattern.EOS in chunk else self.chunks[self._chunk_id(chunk)][1].split())
+        # Matches cannot span a line break, so one pass over all sentences equals one per sentence
+        sentences = _join_emoticons('\n'.join(_sentences(tokens)))
+        return [self._token_id(token) for token in sentences.split()]
+
+    def tokenize(self, texts):
+        """Token ids of a whole batch and the number of tokens per text
+
+        The batch is joined into one string so the contraction/quote rewriting and
+        the whitespace split run once; each distinct chunk is split into pattern
+        tokens only the first time it is seen.
+        """
+        if not texts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        fallback = {row for row, text in enumerate(texts) if DOC_MARK in text}
+        chunks = _rewrite(DOC_SEPARATOR.join(t.replace(DOC_MARK, '') for t in texts)).split()
+        codes = np.fromiter(map(self.chunk_index.get, chunks, repeat(-1)), dtype=np.int64, count=len(chunks))
+        for position in np.flatnonzero(codes < 0):
+            codes[position] = self._chunk_id(chunks[position])
+
+        c = self._chunk_tables()
+        is_mark = codes == 0
+        chunk_doc = np.cumsum(is_mark)
+        lengths = c['lengths'][codes]
+        ends = np.cumsum(lengths)
+        ids = c['ids'][np.repeat(c['offsets'][codes] - (ends - lengths), lengths) + np.arange(ends[-1])]
+        counts = np.bincount(np.repeat(chunk_doc, lengths), minlength=len(texts))
+
+        # pattern joins spaced-out emoticons and "( ! )" within sentences; only texts
+        # where that can happen are checked, and only those that do need the sentence split
+        seq = codes[(lengths > 0) | is_mark]
+        seq_doc = np.cumsum(seq == 0)
+        heads, tails = c['head'][seq], c['tail'][seq]
+        cross = (tails[:-1] >= 0) & (heads[1:] >= 0)
+        cross[cross] = PIECE_AFTER[tails[:-1][cross], heads[1:][cross]]
+        suspects = set(seq_doc[np.flatnonzero(cross) + 1]) | set(seq_doc[c['inner'][seq]])
+        if suspects:
+            bounds = np.searchsorted(seq_doc, np.arange(len(texts) + 1))
+            for row in suspects - fallback:
+                doc_seq = seq[bounds[row]:bounds[row + 1]]
+                if _spaced_emoticon(' '.join(c['joined'][doc_seq[doc_seq != 0]])):
+                    fallback.add(int(row))
+        if fallback:
+            segments = np.split(ids, np.cumsum(counts)[:-1])
+            for row in fallback:
+                segments[row] = np.array(self._sentence_ids(texts[row]), dtype=np.int64)
+                counts[row] = len(segments[row])
+            ids = np.concatenate(segments)
+        return ids, counts
+
+    # ---- scoring ----
+
+    def _states(self, ids, starts):
+        """Scan state (modifier * 2 + negation) before every token
+
+        Most tokens fix the state outright (known words, longer unknown words); for
+        the rest the transitions are composed by pointer jumping, so a run of k short
+        tokens takes log2(k) rounds.
+        """
+        t = self._token_tables()
+        after = t['fixed'][ids]
+        after[starts] = t['transition'][ids[starts], 0]
+        rows = np.flatnonzero(after < 0)
+        if len(rows):
+            funcs = t['transition'][ids[rows]]
+            link = np.arange(len(rows)) - 1
+            chained = np.zeros(len(rows), dtype=bool)
+            chained[1:] = rows[1:] == rows[:-1] + 1
+            link[~chained] = -1
+            # A row after a fixed state collapses to a constant function at once
+            head = np.flatnonzero(~chained)
+            funcs[head] = funcs[head, after[rows[head] - 1]][:, None]
+            pending = np.flatnonzero(chained)
+            while len(pending):
+                previous = link[pending]
+                funcs[pending] = np.take_along_axis(funcs[pending], funcs[previous].astype(np.intp), axis=1)
+                link[pending] = link[previous]
+                pending = pending[link[pending] >= 0]
+            after[rows] = funcs[:, 0]
+        before = np.empty_like(after)
+        before[0] = 0
+        before[1:] = after[:-1]
+        before[starts] = 0
+        return before
+
+    def score(self, texts):
+        """(polarity, subjectivity) arrays for an iterable of texts; missing values score 0"""
+        texts = [text_of(text) for text in texts]
+        ids, counts = self.tokenize(texts)
+        polarity = np.zeros(len(texts))
+        subjectivity = np.zeros(len(texts))
+        if not len(ids):
+            return polarity, subjectivity
+
+        t = self._token_tables()
+        doc = np.repeat(np.arange(len(texts)), counts)
+        starts = np.zeros(len(ids), dtype=bool)
+        starts[(np.cumsum(counts) - counts)[counts > 0]] = True
+        before = self._states(ids, starts)
+        modifier, negated = before // 2, before % 2
+
+        known = t['known'][ids]
+        create = np.where(known, modifier == 0, t['creates'][ids])
+        merge = known & (modifier > 0)
+        negate = known & (negated == 1)
+        absorb = t['absorbs'][ids, before]
+
+        # a[-1] for each token: the latest assessment, counting one created at the token for known words
+        created = np.cumsum(create)
+        last = np.where(known, created, created - create) - 1
+        first_of_doc = np.concatenate([[0], np.cumsum(np.bincount(doc[create], minlength=len(texts)))[:-1]])
+        bang = t['bang'][ids] & (last >= first_of_doc[doc])
+
+        # Known words and created assessments set p/s; a merge scales them by the previous intensity
+        setters = np.flatnonzero(create | merge)
+        intensity = t['i'][ids[setters]]
+        intensity = np.where(negate[setters], 1.0 / intensity, intensity)
+        previous = np.concatenate([[1.0], intensity[:-1]])
+        is_merge = merge[setters]
+        p = np.where(is_merge, np.clip(t['p'][ids[setters]] * previous, -1.0, 1.0), t['p'][ids[setters]])
+        s = np.where(is_merge, np.clip(t['s'][ids[setters]] * previous, -1.0, 1.0), t['s'][ids[setters]])
+
+        # Setters come in token order, so each assessment keeps its last one
+        group = created[setters] - 1
+        groups = created[-1]
+        closing = np.flatnonzero(np.append(group[1:] != group[:-1], True))
+        final = setters[closing]
+        p_final = p[closing]
+        s_final = s[closing]
+
+        # "!" after an assessment's last word boosts it by 25%, clamped each time
+        boosts = np.flatnonzero(bang)
+        boosts = boosts[boosts > final[last[boosts]]]
+        boost_counts = np.bincount(last[boosts], minlength=groups)
+        for round_ in range(boost_counts.max(initial=0)):
+            hit = boost_counts > round_
+            p_final[hit] = np.clip(p_final[hit] * 1.25, -1.0, 1.0)
+
+        # "not good" = slightly bad, "not bad" = slightly good
+        negative = np.zeros(groups, dtype=bool)
+        negative[last[negate | absorb]] = True
+        p_final = np.where(negative, p_final * -0.5, p_final)
+
+        group_doc = doc[create]
+        assessments = np.maximum(np.bincount(group_doc, minlength=len(texts)), 1)
+        polarity = np.bincount(group_doc, weights=p_final, minlength=len(texts)) / assessments
+        subjectivity = np.bincount(group_doc, weights=s_final, minlength=len(texts)) / assessments
+        return polarity, subjectivity
+
+
+def text_of(value):
+    """str(value), with None/NaN as an empty text"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    return str(value)
+
+
+def sentiment_labels(polarity, threshold=0.1):
+    """'positive' / 'negative' / 'neutral' for an array of polarities"""
+    polarity = np.asarray(polarity, dtype=float)
+    return np.select([polarity > threshold, polarity < -threshold], ['positive', 'negative'], 'neutral')
+
+
+_scorer = None
+
+
+def score_texts(texts, cache=True):
+    """(polarity, subjectivity) arrays, served from the sentiment cache where possible
+
+    The scorer is module-wide, so the lexicon table and token cache are built once
+    per process.
+    """
+    global _scorer
+    if _scorer is None:
+        _scorer = PatternScorer()
+    if not cache:
+        return _scorer.score(texts)
+    results = shared_cache().scores(MODEL_NAME, MODEL_VERSION, texts,
+                                    lambda batch: np.column_stack(_scorer.score(batch)).tolist())
+    scores = np.array(results, dtype=float).reshape(-1, 2)
+    return scores[:, 0], scores[:, 1]
+
+
+def sentiment_frame(texts, threshold=0.1, cache=True):
+    """DataFrame of polarity, subjectivity and sentiment label, aligned with a Series' index"""
+    polarity, subjectivity = score_texts(texts, cache)
+    return pd.DataFrame({
+        'polarity': polarity,
+        'subjectivity': subjectivity,
+        'sentiment': sentiment_labels(polarity, threshold)
+    }, index=texts.index if isinstance(texts, pd.Series) else None)
@@ -0,0 +1,188 @@
+import csv
+import re
+import sys
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import numpy as np
+
+# ------------------------------
+# Canonical post ids (Reddit fullnames) and MinHash-LSH near-duplicate grouping
+# ------------------------------
+INPUT_FILE = 'final_dhaka_dataset.json'
+OUTPUT_FILE = 'duplicate_groups.csv'
+
+URL_PATTERN = re.compile(r'https?://\S+')
+TOKEN_PATTERN = re.compile(r'\w+')
+REDDIT_HOSTS = ('reddit.com', 'redd.it')
+TRACKING_PARAMS = {'si', 'feature', 'fbclid', 'gclid', 'ref', 'share', 's', 't'}
+POST_ID_PATTERN = re.compile(r'/(?:comments|gallery)/([a-z0-9]+)')
+
+
+def post_id_from_url(url):
+    """Reddit base-36 post id from a permalink, comments URL or gallery URL"""
+    match = POST_ID_PATTERN.search(str(url or ''))
+    return match.group(1) if match else None
+
+
+def post_id(post):
+    """Base-36 Reddit id from an id/name field, the permalink or the url"""
+    name = post.get('name') or post.get('fullname')
+    if name and name.startswith('t3_'):
+        return name[3:]
+    return post.get('id') or post_id_from_url(post.get('permalink')) or post_id_from_url(post.get('url'))
+
+
+def fullname(post):
+    """Reddit fullname ('t3_<id>'), or None when the record carries no post id"""
+    pid = post_id(post)
+    return f"t3_{pid}" if pid else None
+
+
+def link_key(post):
+    """Normalised external URL of a link post (None for self/media posts)"""
+    url = post.get('url')
+    if not url:
+        return None
+    parts = urlsplit(url)
+    host = parts.netloc.lower().removeprefix('www.').removeprefix('m.')
+    if not host or host.endswith(REDDIT_HOSTS):
+        return None
+    # Keep identifying query parameters (youtube.com/watch?v=...), drop tracking ones
+    query = sorted((k, v) for k, v in parse_qsl(parts.query)
+                   if k not in TRACKING_PARAMS and not k.startswith('utm_'))
+    return f"{host}{parts.path.rstrip('/')}" + (f"?{urlencode(query)}" if query else '')
+
+
+def shingles(text, size=3):
+    """Word n-grams of the normalised text; short texts fall back to single words"""
+    tokens = TOKEN_PATTERN.findall(URL_PATTERN.sub(' ', str(text or '')).lower())
+    if len(tokens) < size:
+        return set(tokens)
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """MinHash signatures bucketed by LSH bands
+
+    With `bands` x `rows` = num_perm, two texts with Jaccard similarity s share at
+    least one band bucket with probability 1 - (1 - s**rows)**bands, so only
+    bucket-mates are compared and grouping stays far below all-pairs cost.
+    Candidates are confirmed against `threshold` on the estimated Jaccard.
+    """
+
+    def __init__(self, threshold=0.7, num_perm=128, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: (a * x + b) mod 2**64, top 32 bits; a must be odd
+        self.a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self.keys = []
+        self.signatures = []
+        self.buckets = {}
+
+    def signature(self, text):
+        grams = shingles(text)
+        if not grams:
+            return None
+        x = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+        with np.errstate(over='ignore'):
+            hashed = (self.a[:, None] * x[None, :] + self.b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def add(self, key, text):
+        """Index one document; returns the keys of already indexed near-duplicates"""
+        sig = self.signature(text)
+        if sig is None:
+            return []
+        index = len(self.keys)
+        self.keys.append(key)
+        self.signatures.append(sig)
+
+        candidates = set()
+        for band in range(self.bands):
+            bucket = (band, sig[band * self.rows:(band + 1) * self.rows].tobytes())
+            members = self.buckets.setdefault(bucket, [])
+            candidates.update(members)
+            members.append(index)
+
+        return [self.keys[other] for other in candidates
+                if np.mean(self.signatures[other] == sig) >= self.threshold]
+
+
+class DisjointSet:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x, y):
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            # The oldest post names the group (base-36 ids grow over time)
+            older, newer = sorted((rx, ry), key=lambda name: (len(name), name))
+            self.parent[newer] = older
+
+
+def duplicate_groups(posts, threshold=0.7):
+    """{fullname: group fullname} for every post that has a repost, crosspost or near-duplicate
+
+    Crossposts join their parent, link posts to the same article join each other and
+    texts whose title+body MinHash similarity reaches `threshold` are grouped.
+    """
+    index = NearDuplicateIndex(threshold=threshold)
+    groups = DisjointSet()
+    links = {}
+    for post in posts:
+        name = fullname(post)
+        if name is None:
+            continue
+        groups.find(name)
+
+        parent = post.get('crosspost_parent')
+        if parent:
+            groups.union(name, parent)
+
+        link = link_key(post)
+        if link:
+            if link in links:
+                groups.union(name, links[link])
+            else:
+                links[link] = name
+
+        text = f"{post.get('title') or ''} {post.get('body') or post.get('selftext') or ''}"
+        for other in index.add(name, text):
+            groups.union(name, other)
+
+    members = {}
+    for name in groups.parent:
+        members.setdefault(groups.find(name), []).append(name)
+    return {name: root for root, names in members.items() if len(names) > 1 for name in names}
+
+
+if __name__ == "__main__":
+    from to_json import iter_posts
+
+    input_file = sys.argv[1] if len(sys.argv) > 1 else INPUT_FILE
+    print(f"Indexing {input_file}...")
+    posts = {fullname(post): post for post in iter_posts(input_file) if fullname(post)}
+    groups = duplicate_groups(posts.values())
+
+    rows = sorted(groups.items(), key=lambda item: (item[1], item[0]))
+    with open(OUTPUT_FILE, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['group', 'fullname', 'subreddit', 'title'])
+        for name, group in rows:
+            writer.writerow([group, name, posts[name].get('subreddit'), posts[name].get('title')])
+
+    print(f"✓ {len(set(groups.values()))} duplicate groups covering {len(groups)} of {len(posts)} posts")
+    print(f"✓ Saved to {OUTPUT_FILE}")
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from post_identity import post_id
+
+# ------------------------------
+# Local SQLite database of posts, analysis results and crawl runs
+# ------------------------------
+STORE_FILE = "post_store/posts.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    post_id TEXT PRIMARY KEY,
+    subreddit TEXT COLLATE NOCASE,     -- listings say "Dhaka", crawlers say "dhaka"
+    title TEXT,
+    body TEXT,
+    url TEXT,
+    permalink TEXT,
+    author TEXT,
+    upvotes INTEGER,
+    comments INTEGER,
+    created_utc REAL,
+    first_seen REAL,
+    last_seen REAL
+);
+CREATE INDEX IF NOT EXISTS posts_subreddit ON posts (subreddit, created_utc);
+CREATE INDEX IF NOT EXISTS posts_created ON posts (created_utc);
+CREATE INDEX IF NOT EXISTS posts_author ON posts (author);
+
+CREATE TABLE IF NOT EXISTS analysis (
+    post_id TEXT PRIMARY KEY REFERENCES posts (post_id),
+    polarity REAL,
+    subjectivity REAL,
+    sentiment TEXT,
+    emotion TEXT,
+    topics TEXT,
+    areas TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS analysis_sentiment ON analysis (sentiment);
+
+-- one row per (post, area) and (post, topic), so area/topic filters use an index
+CREATE TABLE IF NOT EXISTS post_areas (
+    post_id TEXT,
+    area TEXT,
+    PRIMARY KEY (area, post_id)
+);
+CREATE TABLE IF NOT EXISTS post_topics (
+    post_id TEXT,
+    topic TEXT,
+    PRIMARY KEY (topic, post_id)
+);
+
+CREATE TABLE IF NOT EXISTS crawl_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    started_at REAL,
+    finished_at REAL,
+    posts INTEGER
+);
+"""
+
+# Full-text index over title/body, kept in sync with `posts` by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    title, body, content='posts', content_rowid='rowid', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts (rowid, title, body) VALUES (new.rowid, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, body) VALUES ('delete', old.rowid, old.title, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF title, body ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, body) VALUES ('delete', old.rowid, old.title, old.body);
+    INSERT INTO posts_fts (rowid, title, body) VALUES (new.rowid, new.title, new.body);
+END;
+"""
+
+UPSERT_POST = """
+INSERT INTO posts (post_id, subreddit, title, body, url, permalink, author, upvotes, comments,
+                   created_utc, first_seen, last_seen)
+VALUES (:post_id, :subreddit, :title, :body, :url, :permalink, :author, :upvotes, :comments,
+        :created_utc, :seen, :seen)
+ON CONFLICT (post_id) DO UPDATE SET
+    title = excluded.title,
+    body = excluded.body,
+    upvotes = excluded.upvotes,
+    comments = excluded.comments,
+    permalink = COALESCE(excluded.permalink, posts.permalink),
+    last_seen = excluded.last_seen
+"""
+
+
+def _timestamp(value):
+    """Epoch seconds from created_utc or a 'YYYY-mm-dd HH:MM:SS' date string"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return pd.Timestamp(value).timestamp()
+
+
+def fts_query(text):
+    """User text as an FTS5 query: each word a quoted string, so '-', "'" and '+' are not syntax
+
+    >>> print(fts_query("Gulshan-2 don't C++"))
+    "Gulshan-2" "don't" "C++"
+    """
+    return ' '.join('"' + token.replace('"', '""') + '"' for token in str(text).split())
+
+
+def post_row(post):
+    """Store row from either a raw Reddit listing item or a crawler output record
+
+    Records without a Reddit id (e.g. url-only exports) are keyed by a hash of
+    their url; None only when there is neither.
+    """
+    permalink = post.get('permalink')
+    if permalink and permalink.startswith('/'):
+        permalink = f"https://www.reddit.com{permalink}"
+    pid = post_id({**post, 'permalink': permalink})
+    if not pid and post.get('url'):
+        pid = 'url:' + hashlib.sha1(post['url'].encode('utf-8')).hexdigest()
+    if not pid:
+        return None
+    return {
+        'post_id': pid,
+        'subreddit': post.get('subreddit'),
+        'title': post.get('title'),
+        'body': post.get('body', post.get('selftext')),
+        'url': post.get('url'),
+        'permalink': permalink,
+        'author': post.get('author'),
+        'upvotes': post.get('upvotes', post.get('score')),
+        'comments': post.get('comments', post.get('num_comments')),
+        'created_utc': _timestamp(post.get('created_utc') or post.get('date') or post.get('created'))
+    }
+
+
+class PostStore:
+    """Indexed post database; crawlers upsert into it, analyzers and reports query it"""
+
+    def __init__(self, path=STORE_FILE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        try:
+            self.db.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: text search falls back to LIKE
+            self.fts = False
+        self.db.commit()
+
+    def upsert_posts(self, posts):
+        """Insert new posts; for known ones the latest upvote/comment counts win"""
+        now = time.time()
+        rows = list(map(post_row, posts))
+        skipped = rows.count(None)
+        rows = [row for row in rows if row is not None]
+        if skipped:
+            print(f"   ⚠️  {skipped} posts without an id or url not stored")
+        for row in rows:
+            row['seen'] = now
+        self.db.executemany(UPSERT_POST, rows)
+        self.db.commit()
+        return len(rows)
+
+    def upsert_analysis(self, post_id, polarity=None, subjectivity=None, sentiment=None, emotion=None,
+                        topics=(), areas=()):
+        topics, areas = list(topics), list(areas)
+        self.db.execute(
+            "INSERT OR REPLACE INTO analysis VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (post_id, polarity, subjectivity, sentiment, emotion,
+             json.dumps(topics, ensure_ascii=False), json.dumps(areas, ensure_ascii=False), time.time())
+        )
+        self.db.execute("DELETE FROM post_topics WHERE post_id = ?", (post_id,))
+        self.db.execute("DELETE FROM post_areas WHERE post_id = ?", (post_id,))
+        self.db.executemany("INSERT OR IGNORE INTO post_topics VALUES (?, ?)", [(post_id, t) for t in topics])
+        self.db.executemany("INSERT OR IGNORE INTO post_areas VALUES (?, ?)", [(post_id, a) for a in areas])
+
+    def start_run(self, name):
+        cursor = self.db.execute("INSERT INTO crawl_runs (name, started_at) VALUES (?, ?)", (name, time.time()))
+        self.db.commit()
+        return cursor.lastrowid
+
+    def finish_run(self, run_id, posts):
+        self.db.execute("UPDATE crawl_runs SET finished_at = ?, posts = ? WHERE run_id = ?",
+                        (time.time(), posts, run_id))
+        self.db.commit()
+
+    def commit(self):
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def query(self, sql, params=()):
+        """Run any SQL against the store and return a DataFrame"""
+        return pd.read_sql_query(sql, self.db, params=params)
+
+    def find_posts(self, text=None, subreddit=None, sentiment=None, topic=None, area=None,
+                   since=None, until=None, limit=None):
+        """Posts joined with their analysis, filtered through the indexes
+
+        e.g. find_posts(sentiment='negative', topic='Housing/Real Estate', area='Gulshan',
+        since=datetime.now() - timedelta(days=30))
+        """
+        joins = ["LEFT JOIN analysis a ON a.post_id = p.post_id"]
+        join_params = []
+        where = []
+        params = []
+        if text:
+            if self.fts:
+                joins.append("JOIN posts_fts f ON f.rowid = p.rowid")
+                where.append("posts_fts MATCH ?")
+                params.append(fts_query(text))
+            else:
+                where.append("(p.title LIKE ? OR p.body LIKE ?)")
+                params.extend([f"%{text}%"] * 2)
+        if topic:
+            joins.append("JOIN post_topics t ON t.post_id = p.post_id AND t.topic = ?")
+            join_params.append(topic)
+        if area:
+            joins.append("JOIN post_areas r ON r.post_id = p.post_id AND r.area = ?")
+            join_params.append(area)
+        if subreddit:
+            where.append("p.subreddit = ?")
+            params.append(subreddit)
+        if sentiment:
+            where.append("a.sentiment = ?")
+            params.append(sentiment)
+        if since is not None:
+            where.append("p.created_utc >= ?")
+            params.append(_timestamp(since))
+        if until is not None:
+            where.append("p.created_utc <= ?")
+            params.append(_timestamp(until))
+
+        sql = f"SELECT p.*, a.polarity, a.subjectivity, a.sentiment, a.emotion, a.topics, a.areas FROM posts p {' '.join(joins)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY p.created_utc DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self.query(sql, join_params + params)
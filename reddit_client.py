@@ -0,0 +1,320 @@
+import asyncio
+import json
+import random
+import time
+from collections import namedtuple
+
+import aiohttp
+
+from response_cache import cache_key
+
+# ------------------------------
+# Shared async fetch engine for all crawl_* scripts
+# ------------------------------
+REDDIT_BASE = "https://www.reddit.com"
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# One pagination chain: a search or listing endpoint walked via the `after` cursor
+ListingJob = namedtuple('ListingJob', ['key', 'url', 'params', 'max_items'])
+
+
+class RedditHTTPError(Exception):
+    """Non-200 response from Reddit"""
+
+    def __init__(self, status, url):
+        super().__init__(f"Status {status} for {url}")
+        self.status = status
+        self.url = url
+
+
+class TokenBucket:
+    """Adaptive token-bucket rate limiter that follows Reddit's X-Ratelimit-* headers
+
+    The send rate is the lower of the quota left in the current reset window and an
+    adaptive ceiling. The ceiling grows while responses show headroom and halves on
+    every 429, when all requests also pause for the Retry-After delay.
+    """
+
+    def __init__(self, rate=1.0, capacity=5, max_rate=10.0, min_rate=0.05):
+        self.rate = rate            # tokens refilled per second
+        self.capacity = capacity    # maximum burst
+        self.ceiling = rate         # adaptive upper bound on the rate
+        self.quota_rate = None      # rate the remaining X-Ratelimit quota allows
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.paused_until = 0.0
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _set_rate(self):
+        self.rate = self.ceiling if self.quota_rate is None else min(self.ceiling, self.quota_rate)
+        self.rate = max(self.rate, self.min_rate)
+
+    async def acquire(self):
+        """Wait until one request may be sent; returns seconds spent throttled by a 429 pause"""
+        throttled = 0.0
+        async with self.lock:
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                throttled = pause
+                await asyncio.sleep(pause)
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+        return throttled
+
+    def update_from_headers(self, headers):
+        """Spread the remaining quota evenly over the current reset window"""
+        remaining = headers.get('X-Ratelimit-Remaining')
+        reset = headers.get('X-Ratelimit-Reset')
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining = float(remaining)
+            reset = max(float(reset), 1.0)
+        except ValueError:
+            return
+
+        self.quota_rate = max(remaining / reset, self.min_rate)
+        if remaining < 1:
+            self.tokens = min(self.tokens, 0)
+        self._set_rate()
+
+    def speed_up(self):
+        """Successful response: raise the ceiling while the quota still has headroom"""
+        if self.quota_rate is None or self.quota_rate > self.ceiling:
+            self.ceiling = min(self.max_rate, self.ceiling * 1.1)
+            self._set_rate()
+
+    def slow_down(self, delay):
+        """429 response: halve the ceiling and pause every request for `delay` seconds"""
+        self.ceiling = max(self.min_rate, self.ceiling / 2)
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        self.tokens = 0
+        self._set_rate()
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(headers):
+    """Retry-After header in seconds, if the server sent one"""
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+class RedditClient:
+    """Pooled aiohttp session with a per-host connection limit and a shared rate limiter"""
+
+    def __init__(self, headers=None, max_per_host=4, rate=1.0, burst=5, timeout=10, cache=None,
+                 max_retries=5, max_rate=10.0):
+        self.headers = headers or DEFAULT_HEADERS
+        self.cache = cache      # optional ResponseCache
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.limiter = TokenBucket(rate=rate, capacity=burst, max_rate=max_rate)
+        self.session = None
+        # Per-run counters
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'throttle_seconds': 0.0}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit_per_host=self.max_per_host)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def get_json(self, url, params=None):
+        """GET a Reddit JSON endpoint under the rate limiter, via the response cache if set"""
+        entry = None
+        request_headers = {}
+        if self.cache is not None:
+            key = cache_key(url, params)
+            entry = self.cache.get(key)
+            if entry is not None and entry['fresh']:
+                self.cache.hits += 1
+                self.cache.touch(key)
+                return json.loads(entry['body'])
+            if entry is not None:
+                request_headers = self.cache.conditional_headers(entry)
+
+        for attempt in range(self.max_retries + 1):
+            self.stats['throttle_seconds'] += await self.limiter.acquire()
+            self.stats['requests'] += 1
+            try:
+                async with self.session.get(url, params=params, headers=request_headers) as response:
+                    self.limiter.update_from_headers(response.headers)
+
+                    if response.status == 304 and entry is not None:
+                        self.cache.revalidated += 1
+                        self.cache.touch(key, revalidated=True)
+                        self.limiter.speed_up()
+                        return json.loads(entry['body'])
+
+                    if response.status == 200:
+                        body = await response.read()
+                        if self.cache is not None:
+                            self.cache.misses += 1
+                            self.cache.put(key, url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                        self.limiter.speed_up()
+                        return json.loads(body)
+
+                    if response.status != 429 and response.status < 500:
+                        raise RedditHTTPError(response.status, url)
+
+                    # 429 or a 5xx: wait for Retry-After (or back off) and try again
+                    delay = retry_after_seconds(response.headers)
+                    if delay is None:
+                        delay = backoff_delay(attempt)
+                    if response.status == 429:
+                        # Every job waits out the pause inside limiter.acquire()
+                        self.stats['throttled'] += 1
+                        self.limiter.slow_down(delay)
+                        delay = 0.0
+                    error = RedditHTTPError(response.status, url)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                delay = backoff_delay(attempt)
+                error = e
+
+            if attempt == self.max_retries:
+                raise error
+            self.stats['retries'] += 1
+            if delay:
+                self.stats['throttle_seconds'] += delay
+                await asyncio.sleep(delay)
+
+    async def paginate(self, url, params, max_items=None, after=None, fetched=0):
+        """Yield (children, after) for each page, following the `after` cursor"""
+        params = dict(params)
+
+        while max_items is None or fetched < max_items:
+            if after:
+                params['after'] = after
+
+            data = await self.get_json(url, params)
+            children = data.get('data', {}).get('children', [])
+            if not children:
+                break
+
+            after = data.get('data', {}).get('after')
+            fetched += len(children)
+            yield children, after
+
+            if not after:
+                break
+
+
+async def crawl_listings_async(client, jobs, on_page, checkpoint=None, high_water=None):
+    """Paginate every job concurrently; on_page(job, children) returning False stops that job
+
+    With a CrawlCheckpoint, pages logged by an earlier run are replayed into on_page
+    first and unfinished jobs resume from their saved `after` cursor. With
+    HighWaterMarks, only posts newer than the previous run are passed on and each
+    job stops paginating at the first already-known post. A job's mark only moves
+    once it reached a known post or the end of the listing; one cut short by
+    max_items or on_page keeps the old mark, so the gap is fetched next time.
+    """
+    if checkpoint is not None:
+        for job, children in checkpoint.replay(jobs):
+            if high_water is not None:
+                high_water.advance(job, children)
+            on_page(job, children)
+
+    async def run_job(job):
+        after, fetched, done = None, 0, False
+        if checkpoint is not None:
+            after, fetched, done = checkpoint.state(job)
+            if done:
+                # after is None once a known post or the end of the listing was reached
+                if high_water is not None and after is None:
+                    high_water.commit(job)
+                return
+
+        stopped = False
+        try:
+            async for children, after in client.paginate(job.url, job.params, job.max_items, after, fetched):
+                fetched += len(children)
+
+                if high_water is not None:
+                    high_water.advance(job, children)
+                    fresh = [child for child in children if not high_water.is_known(job, child)]
+                    if len(fresh) < len(children):
+                        after = None    # reached posts fetched by an earlier run
+                    children = fresh
+
+                keep_going = not children or on_page(job, children) is not False
+                stopped = not keep_going
+                if checkpoint is not None:
+                    checkpoint.record_page(job, children, after, fetched, done=not (keep_going and after))
+                if not (keep_going and after):
+                    break
+        except (aiohttp.ClientError, asyncio.TimeoutError, RedditHTTPError) as e:
+            # The job's checkpoint stays open, so a rerun picks up from the last page
+            print(f"   Error on {job.key}: {e}")
+            if checkpoint is not None:
+                checkpoint.mark_failed(job)
+            return
+
+        if checkpoint is not None:
+            checkpoint.mark_done(job)
+        capped = job.max_items is not None and fetched >= job.max_items
+        if high_water is not None and not stopped and (after is None or not capped):
+            high_water.commit(job)
+
+    await asyncio.gather(*(run_job(job) for job in jobs))
+
+
+def crawl_listings(jobs, on_page, checkpoint=None, high_water=None, **client_kwargs):
+    """Blocking entry point used by the crawl_* scripts"""
+
+    async def run():
+        async with RedditClient(**client_kwargs) as client:
+            await crawl_listings_async(client, jobs, on_page, checkpoint, high_water)
+            stats = client.stats
+            print(f"   Requests: {stats['requests']} | Retries: {stats['retries']} | "
+                  f"429s: {stats['throttled']} | Throttled: {stats['throttle_seconds']:.1f}s")
+
+    asyncio.run(run())
+
+def search_job(subreddit, query, max_items=None, key=None, **extra_params):
+    """ListingJob for /r/{subreddit}/search.json sorted by new"""
+    params = {
+        'q': query,
+        'restrict_sr': 'on',
+        'sort': 'new',
+        'limit': 100
+    }
+    params.update(extra_params)
+    return ListingJob(key or (subreddit, query), f"{REDDIT_BASE}/r/{subreddit}/search.json", params, max_items)
+
+
+def new_listing_job(subreddit, max_items=None, key=None):
+    """ListingJob for /r/{subreddit}/new/.json"""
+    params = {
+        'limit': 100,
+        'sort': 'new'
+    }
+    return ListingJob(key or subreddit, f"{REDDIT_BASE}/r/{subreddit}/new/.json", params, max_items)
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import sqlite3
+import time
+from urllib.parse import urlencode
+
+# ------------------------------
+# On-disk HTTP response cache for Reddit JSON endpoints
+# ------------------------------
+
+def cache_key(url, params=None):
+    """URL plus sorted query params, hashed"""
+    query = urlencode(sorted((params or {}).items()))
+    return hashlib.sha1(f"{url}?{query}".encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL, ETag/Last-Modified revalidation and LRU eviction
+
+    Entries younger than `ttl` seconds are served without touching the network.
+    Older entries are revalidated with If-None-Match / If-Modified-Since when the
+    server sent validators. Once the stored bodies exceed `max_bytes`, the least
+    recently used entries are dropped.
+    """
+
+    def __init__(self, directory="http_cache", ttl=6 * 3600, max_bytes=200 * 1024 * 1024):
+        os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+        self.db = sqlite3.connect(os.path.join(directory, "responses.sqlite3"))
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                accessed_at REAL,
+                size INTEGER,
+                body BLOB
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed_at)")
+        self.db.commit()
+
+    def get(self, key):
+        """Cached entry as a dict, or None"""
+        row = self.db.execute(
+            "SELECT etag, last_modified, stored_at, body FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, stored_at, body = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': time.time() - stored_at < self.ttl,
+            'body': body
+        }
+
+    def touch(self, key, revalidated=False):
+        """Mark an entry as used; a 304 also restarts its TTL"""
+        now = time.time()
+        if revalidated:
+            self.db.execute("UPDATE responses SET accessed_at = ?, stored_at = ? WHERE key = ?", (now, now, key))
+        else:
+            self.db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self.db.commit()
+
+    def conditional_headers(self, entry):
+        """Validators for revalidating a stale entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, key, url, body, etag=None, last_modified=None):
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, url, etag, last_modified, now, now, len(body), body)
+        )
+        self._evict()
+        self.db.commit()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self):
+        self.db.close()
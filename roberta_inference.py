@@ -0,0 +1,328 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------
+# Batched, length-bucketed inference for the Hugging Face sequence classifiers
+# ------------------------------
+BATCH_SIZE = 32
+MAX_TOKENS = 512
+ONNX_DIR = "onnx_models"
+
+# cardiffnlp/twitter-roberta-base-sentiment only names its classes LABEL_0..2
+GENERIC_LABELS = {
+    'cardiffnlp/twitter-roberta-base-sentiment': ['negative', 'neutral', 'positive'],
+}
+
+# How window probabilities combine into one per text (see aggregate_windows)
+AGGREGATES = ('mean', 'length_weighted', 'max_negative')
+NEGATIVE_LABELS = {'negative', 'anger', 'disgust', 'fear', 'sadness'}
+
+# Token ids per model and text, kept for the life of the process
+_token_cache = {}
+
+
+def require_transformers():
+    try:
+        import torch
+        import transformers
+    except ImportError:
+        raise ImportError("RoBERTa inference needs 'torch' and 'transformers' (pip install torch transformers)")
+    return torch, transformers
+
+
+def require_tokenizers():
+    try:
+        import transformers
+    except ImportError:
+        raise ImportError("Tokenising for the ONNX backend needs 'transformers' (pip install transformers)")
+    return transformers
+
+
+def require_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError:
+        raise ImportError("The ONNX backend needs the 'onnxruntime' package (pip install onnxruntime)")
+    return onnxruntime
+
+
+class BatchedClassifier:
+    """Sequence classifier run over batches of similar token length
+
+    All texts are tokenised in one call, sorted by token count and cut into
+    batches of `batch_size`, so each batch is padded only to its own longest
+    text instead of every text going through the model alone. Results come back
+    in input order.
+
+    Texts longer than `max_tokens` are truncated, or with a `stride` split into
+    overlapping windows that are all batched together and aggregated per text.
+    """
+
+    tensor_type = 'pt'
+
+    def __init__(self, model_name, batch_size=BATCH_SIZE, threads=None, max_tokens=MAX_TOKENS):
+        torch, transformers = require_transformers()
+        if threads:
+            torch.set_num_threads(threads)
+        self.torch = torch
+        self.load_tokenizer(transformers, model_name, batch_size, max_tokens)
+        self.model = transformers.AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    def load_tokenizer(self, transformers, model_name, batch_size, max_tokens):
+        """Tokenizer, labels and version: everything except the PyTorch weights"""
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.tokenizer = transformers.AutoTokenizer.from_pretrained(model_name)
+        config = transformers.AutoConfig.from_pretrained(model_name)
+        self.labels = GENERIC_LABELS.get(model_name) or [config.id2label[i].lower() for i in range(config.num_labels)]
+        self.version = getattr(config, '_commit_hash', None) or config.transformers_version
+
+    def shares_tokens(self, other):
+        """Whether `other` turns text into the same token ids (e.g. roberta-base and distilroberta-base)"""
+        return (self.max_tokens == other.max_tokens
+                and self.tensor_type == other.tensor_type
+                and self.tokenizer.all_special_ids == other.tokenizer.all_special_ids
+                and self.tokenizer.get_vocab() == other.tokenizer.get_vocab())
+
+    def encode(self, texts):
+        """Token ids per text, without special tokens or truncation; cached, so repeated texts are tokenised once"""
+        cache = _token_cache.setdefault(self.model_name, {})
+        new = list(dict.fromkeys(text for text in texts if text not in cache))
+        if new:
+            cache.update(zip(new, self.tokenizer(new, add_special_tokens=False, verbose=False)['input_ids']))
+        return [cache[text] for text in texts]
+
+    def windows(self, token_ids, stride=None):
+        """(model inputs, index of their text) for a list of encoded texts
+
+        Without a stride each text keeps only its first max_tokens. With one, a text
+        is covered by windows of max_tokens that overlap by `stride` tokens, the
+        last one ending at the end of the text.
+        """
+        size = self.max_tokens - self.tokenizer.num_special_tokens_to_add()
+        step = size if stride is None else size - stride
+        if step <= 0:
+            raise ValueError(f"stride must be smaller than the {size}-token window")
+        inputs = []
+        owners = []
+        for owner, ids in enumerate(token_ids):
+            starts = [0] if stride is None else list(range(0, max(len(ids) - size, 0) + 1, step))
+            if stride is not None and starts[-1] + size < len(ids):
+                starts.append(len(ids) - size)
+            for start in starts:
+                inputs.append(self.tokenizer.build_inputs_with_special_tokens(ids[start:start + size]))
+                owners.append(owner)
+        return inputs, np.array(owners, dtype=np.int64)
+
+    def batches(self, input_ids):
+        """(rows, padded batch) over the model inputs sorted by token count"""
+        order = np.argsort([len(ids) for ids in input_ids], kind='stable')
+        for start in range(0, len(order), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            yield rows, self.tokenizer.pad({'input_ids': [input_ids[row] for row in rows]}, return_tensors=self.tensor_type)
+
+    def forward(self, batch):
+        """Class probabilities of one padded batch"""
+        with self.torch.inference_mode():
+            return self.torch.softmax(self.model(**batch).logits, dim=-1).numpy()
+
+    def predict_proba(self, texts, progress=False, stride=None, aggregate='mean'):
+        """(len(texts), labels) array of class probabilities"""
+        return MultiHeadClassifier([self]).predict_proba(texts, progress, stride, aggregate)[0]
+
+    def predict(self, texts, progress=False, stride=None, aggregate='mean'):
+        """(labels, scores) of the most likely class per text"""
+        return top_class(self.labels, self.predict_proba(texts, progress, stride, aggregate))
+
+
+class OnnxClassifier(BatchedClassifier):
+    """BatchedClassifier run by ONNX Runtime on a dynamically int8-quantised export
+
+    The first use exports the PyTorch model to ONNX_DIR/<model>/model.onnx and
+    quantises its weights to int8 (model.int8.onnx); later runs load the
+    quantised file directly, without importing torch or loading the PyTorch
+    weights. Quantisation shifts the probabilities slightly, see drift_report.
+    """
+
+    tensor_type = 'np'
+
+    def __init__(self, model_name, batch_size=BATCH_SIZE, threads=None, max_tokens=MAX_TOKENS, quantize=True):
+        self.load_tokenizer(require_tokenizers(), model_name, batch_size, max_tokens)
+        onnxruntime = require_onnxruntime()
+        path = self.export(quantize)
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.version = f"{self.version}-onnx{'-int8' if quantize else ''}"
+
+    def export(self, quantize=True):
+        """Path of the (quantised) ONNX model, exporting it on first use"""
+        directory = os.path.join(ONNX_DIR, self.model_name.replace('/', '--'))
+        path = os.path.join(directory, 'model.onnx')
+        quantized = os.path.join(directory, 'model.int8.onnx')
+        if quantize and os.path.exists(quantized):
+            return quantized
+        if not os.path.exists(path):
+            # Only the export needs torch and the PyTorch weights
+            torch, transformers = require_transformers()
+            model = transformers.AutoModelForSequenceClassification.from_pretrained(self.model_name).eval()
+            os.makedirs(directory, exist_ok=True)
+            sample = self.tokenizer(["export sample"], return_tensors='pt')
+            torch.onnx.export(
+                model, (sample['input_ids'], sample['attention_mask']), path,
+                input_names=['input_ids', 'attention_mask'], output_names=['logits'],
+                dynamic_axes={'input_ids': {0: 'batch', 1: 'tokens'},
+                              'attention_mask': {0: 'batch', 1: 'tokens'},
+                              'logits': {0: 'batch'}},
+                opset_version=14
+            )
+        if not quantize:
+            return path
+        if not os.path.exists(quantized):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(path, quantized, weight_type=QuantType.QInt8)
+        return quantized
+
+    def forward(self, batch):
+        logits = self.session.run(['logits'], {'input_ids': batch['input_ids'].astype(np.int64),
+                                               'attention_mask': batch['attention_mask'].astype(np.int64)})[0]
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+def load_classifier(model_name, backend='torch', **options):
+    """BatchedClassifier for backend 'torch', or OnnxClassifier for 'onnx' / 'onnx-fp32'"""
+    if backend == 'torch':
+        return BatchedClassifier(model_name, **options)
+    if backend in ('onnx', 'onnx-fp32'):
+        return OnnxClassifier(model_name, quantize=backend == 'onnx', **options)
+    raise ValueError(f"Unknown backend {backend!r}, expected 'torch', 'onnx' or 'onnx-fp32'")
+
+
+class MultiHeadClassifier:
+    """Several classifiers over the same texts in one pass
+
+    Heads whose tokenizers agree share a single tokenisation, length sort and
+    padded batch per step; each batch goes through every head before the next
+    one is built. (Heads are separate fine-tuned checkpoints, so their encoders
+    still run once each.)
+    """
+
+    def __init__(self, heads):
+        self.heads = list(heads)
+        # Group heads by tokenizer; the first head of a group tokenises for all of it
+        self.groups = []
+        for head in self.heads:
+            for group in self.groups:
+                if group[0].shares_tokens(head):
+                    group.append(head)
+                    break
+            else:
+                self.groups.append([head])
+
+    def predict_proba(self, texts, progress=False, stride=None, aggregate='mean'):
+        """One (len(texts), labels) probability array per head, in head order
+
+        With a `stride`, the windows of all texts are batched together and their
+        probabilities combined per text by `aggregate` (one of AGGREGATES).
+        """
+        texts = list(texts)
+        probs = {}
+        started = time.time()
+        done = 0
+        for group in self.groups:
+            leader = group[0]
+            inputs, owners = leader.windows(leader.encode(texts), stride)
+            window_probs = {id(head): np.zeros((len(inputs), len(head.labels)), dtype=np.float32) for head in group}
+            for rows, batch in leader.batches(inputs):
+                for head in group:
+                    window_probs[id(head)][rows] = head.forward(batch)
+                done += len(rows)
+                if progress:
+                    print(f"  Processing: {done} windows of {len(texts)} texts ({done / (time.time() - started):.1f}/s)...", end='\r')
+            lengths = np.array([len(ids) for ids in inputs])
+            for head in group:
+                probs[id(head)] = aggregate_windows(window_probs[id(head)], owners, lengths, len(texts),
+                                                    head.labels, aggregate)
+        return [probs[id(head)] for head in self.heads]
+
+    def predict(self, texts, progress=False, stride=None, aggregate='mean'):
+        """One (labels, scores) pair per head"""
+        return [top_class(head.labels, probs)
+                for head, probs in zip(self.heads, self.predict_proba(texts, progress, stride, aggregate))]
+
+
+def aggregate_windows(probs, owners, lengths, count, labels, how='mean'):
+    """(count, labels) probabilities per text from the probabilities of its windows
+
+    'mean' averages the windows, 'length_weighted' weights them by token count and
+    'max_negative' keeps the window with the most negative/angry/sad/fearful
+    probability, so one bitter paragraph is not averaged away.
+    """
+    result = np.zeros((count, probs.shape[1]), dtype=probs.dtype)
+    if not len(owners):
+        return result
+    if how == 'max_negative':
+        negative = [i for i, label in enumerate(labels) if label in NEGATIVE_LABELS]
+        order = np.lexsort((-probs[:, negative].sum(axis=1), owners))
+        first = order[np.append(True, owners[order][1:] != owners[order][:-1])]
+        result[owners[first]] = probs[first]
+        return result
+    if how == 'mean':
+        weights = np.ones(len(owners))
+    elif how == 'length_weighted':
+        weights = np.asarray(lengths, dtype=float)
+    else:
+        raise ValueError(f"Unknown aggregate {how!r}, expected one of {AGGREGATES}")
+    np.add.at(result, owners, probs * weights[:, None])
+    total = np.bincount(owners, weights=weights, minlength=count)
+    return result / np.maximum(total, 1e-12)[:, None]
+
+
+def top_class(labels, probs):
+    """(labels, scores) of the most likely class per row"""
+    best = probs.argmax(axis=1)
+    return [labels[i] for i in best], probs[np.arange(len(best)), best].tolist()
+
+
+def drift_report(reference, candidate, texts, **options):
+    """Agreement of a candidate backend with the reference one on the same texts
+
+    One row per head: label agreement, probability differences and posts/s of
+    both backends, plus the most frequent label flips. `options` (stride,
+    aggregate) go to predict_proba.
+    """
+    texts = list(texts)
+    rows = []
+    for ref_head, cand_head in zip(reference, candidate):
+        timings = []
+        probs = []
+        for head in (ref_head, cand_head):
+            # Both backends tokenise from scratch, so the candidate does not time the reference's cache
+            _token_cache.pop(head.model_name, None)
+            started = time.time()
+            probs.append(head.predict_proba(texts, **options))
+            timings.append(len(texts) / max(time.time() - started, 1e-9))
+        ref_labels = np.array(ref_head.labels)[probs[0].argmax(axis=1)]
+        cand_labels = np.array(cand_head.labels)[probs[1].argmax(axis=1)]
+        diff = np.abs(probs[0] - probs[1])
+        flips = pd.Series([f"{a}->{b}" for a, b in zip(ref_labels, cand_labels) if a != b]).value_counts()
+        rows.append({
+            'model': ref_head.model_name,
+            'texts': len(texts),
+            'label_agreement': float((ref_labels == cand_labels).mean()) if len(texts) else 1.0,
+            'max_prob_diff': float(diff.max()) if len(texts) else 0.0,
+            'mean_prob_diff': float(diff.mean()) if len(texts) else 0.0,
+            'reference_posts_per_s': timings[0],
+            'candidate_posts_per_s': timings[1],
+            'speedup': timings[1] / timings[0],
+            'top_flips': ', '.join(f"{flip} ({count})" for flip, count in flips.head(5).items())
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,139 @@
+import asyncio
+
+from reddit_client import RedditClient, crawl_listings_async, search_job
+
+# ------------------------------
+# Time-sliced search to get past Reddit's ~1000-result listing cap
+# ------------------------------
+LISTING_CAP = 1000      # Reddit stops handing out `after` cursors around here
+CAP_SLACK = 100         # the last page before the cap may come back short
+IGNORED_SHARE = 0.5     # a slice page with less than this share inside the slice means no timestamp filter
+
+
+def slice_window(start_ts, end_ts, slices):
+    """Split [start_ts, end_ts] into equal, non-overlapping integer slices"""
+    start_ts, end_ts = int(start_ts), int(end_ts)
+    step = max((end_ts - start_ts) // slices, 1)
+    bounds = []
+    a = start_ts
+    while a <= end_ts:
+        b = min(a + step - 1, end_ts)
+        bounds.append((a, b))
+        a = b + 1
+    return bounds
+
+
+def slice_job(subreddit, query, a, b):
+    """Search job restricted to posts created between a and b (epoch seconds, inclusive)"""
+    return search_job(
+        subreddit,
+        f"({query}) timestamp:{a}..{b}",
+        key=(subreddit, query, a, b),
+        syntax='cloudsearch',
+        t='all'
+    )
+
+
+async def crawl_time_sliced_async(client, searches, on_page, start_ts, end_ts, slices=12,
+                                  min_slice=3600, checkpoint=None):
+    """Crawl every (subreddit, query) search over [start_ts, end_ts] in parallel time slices
+
+    Each round runs all pending slices concurrently. A slice that comes back with a
+    full listing has older posts the cap hid, so the part older than its oldest post
+    is split in two and crawled in the next round. on_page(job, children) receives
+    only posts inside the slice; job.key is (subreddit, query, slice_start, slice_end).
+
+    If Reddit ignores the timestamp syntax, every slice returns the same newest
+    results, mostly outside the slice. Such a search stops slicing after the first
+    page and is crawled once unsliced instead, under the key (subreddit, query,
+    start_ts, end_ts).
+    """
+    pending = [
+        (subreddit, query, a, b)
+        for subreddit, query in searches
+        for a, b in slice_window(start_ts, end_ts, slices)
+    ]
+    rounds = 0
+    unsliced = set()    # (subreddit, query) searches whose timestamp filter was ignored
+    delivered = {}      # (subreddit, query) -> fullnames already passed to on_page
+
+    while pending:
+        rounds += 1
+        coverage = {}   # slice key -> [posts fetched, oldest created_utc in slice]
+
+        def track(job, children):
+            subreddit, query, a, b = job.key
+            if (subreddit, query) in unsliced:
+                return False
+            stats = coverage.setdefault(job.key, [0, None])
+            stats[0] += len(children)
+
+            in_slice = [c for c in children if a <= c.get('data', {}).get('created_utc', 0) <= b]
+            if len(in_slice) < IGNORED_SHARE * len(children):
+                unsliced.add((subreddit, query))
+                return False
+            if not in_slice:
+                return True
+            delivered.setdefault((subreddit, query), set()).update(c['data'].get('name') for c in in_slice)
+            oldest = min(c['data']['created_utc'] for c in in_slice)
+            stats[1] = oldest if stats[1] is None else min(stats[1], oldest)
+            return on_page(job, in_slice)
+
+        jobs = [slice_job(*key) for key in pending]
+        print(f"   Round {rounds}: {len(jobs)} time slices")
+        await crawl_listings_async(client, jobs, track, checkpoint)
+
+        # Narrow dense slices down to the part the listing cap cut off
+        pending = []
+        for (subreddit, query, a, b), (fetched, oldest) in coverage.items():
+            if (subreddit, query) in unsliced:
+                continue
+            if fetched < LISTING_CAP - CAP_SLACK or oldest is None or oldest >= b:
+                continue
+            if oldest - a < min_slice:
+                continue
+            mid = (a + oldest) // 2
+            pending.append((subreddit, query, a, mid))
+            pending.append((subreddit, query, mid + 1, int(oldest) - 1))
+
+    if unsliced:
+        await crawl_unsliced_async(client, sorted(unsliced), on_page, start_ts, end_ts, delivered, checkpoint)
+
+
+async def crawl_unsliced_async(client, searches, on_page, start_ts, end_ts, delivered, checkpoint=None):
+    """Fallback for searches whose timestamp filter was ignored: one plain search over the window"""
+    for subreddit, query in searches:
+        print(f"   ⚠️  r/{subreddit} ignored timestamp:a..b for {query!r}; "
+              f"falling back to one unsliced search (capped at ~{LISTING_CAP} results)")
+
+    def within(job, children):
+        subreddit, query = job.key[:2]
+        seen = delivered.get((subreddit, query), set())
+        in_window = [c for c in children
+                     if start_ts <= c.get('data', {}).get('created_utc', 0) <= end_ts
+                     and c['data'].get('name') not in seen]
+        # Sorted by new: once a page is entirely older than the window, so is the rest
+        if children and all(c.get('data', {}).get('created_utc', 0) < start_ts for c in children):
+            return False
+        if not in_window:
+            return True
+        return on_page(job, in_window)
+
+    jobs = [search_job(subreddit, query, key=(subreddit, query, int(start_ts), int(end_ts)), t='all')
+            for subreddit, query in searches]
+    await crawl_listings_async(client, jobs, within, checkpoint)
+
+
+def crawl_time_sliced(searches, on_page, start_ts, end_ts, slices=12, min_slice=3600,
+                      checkpoint=None, **client_kwargs):
+    """Blocking entry point used by the crawl_* scripts"""
+
+    async def run():
+        async with RedditClient(**client_kwargs) as client:
+            await crawl_time_sliced_async(client, searches, on_page, start_ts, end_ts,
+                                          slices, min_slice, checkpoint)
+            stats = client.stats
+            print(f"   Requests: {stats['requests']} | Retries: {stats['retries']} | "
+                  f"429s: {stats['throttled']} | Throttled: {stats['throttle_seconds']:.1f}s")
+
+    asyncio.run(run())
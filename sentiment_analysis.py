@@ -1,13 +1,21 @@
 import pandas as pd
 import numpy as np
-from textblob import TextBlob
 from collections import Counter
 import re
 import os
 
+from columnar_store import load_frame
+from pattern_scorer import score_texts, sentiment_labels
+from sentiment_fusion import fit_weights, fuse
+
 # Read the CSV file
 csv_file = "dhaka_posts_20251119_224551.csv"
-df = pd.read_csv(csv_file)
+df = load_frame(csv_file)
+
+# How title and body polarity combine: mean, length_weighted, max_magnitude or learned
+# ("learned" fits title/body weights to the RoBERTa labels of enhanced_sentiment_analysis.py)
+FUSION_STRATEGY = "max_magnitude"
+ROBERTA_LABELS = "enhanced_sentiment_analysis/06_posts_with_enhanced_analysis.csv"
 
 print("=" * 100)
 print("SENTIMENT ANALYSIS & TOPIC EXTRACTION")
@@ -18,34 +26,36 @@ print()
 print("🔍 PERFORMING SENTIMENT ANALYSIS...")
 print("-" * 100)
 
-def get_sentiment(text):
-    """Analyze sentiment of text using TextBlob"""
-    if pd.isna(text) or text == "":
-        return 0, "neutral"
-    try:
-        analysis = TextBlob(str(text))
-        polarity = analysis.sentiment.polarity
-        
-        if polarity > 0.1:
-            return polarity, "positive"
-        elif polarity < -0.1:
-            return polarity, "negative"
-        else:
-            return polarity, "neutral"
-    except:
-        return 0, "neutral"
-
-# Apply sentiment analysis to title and body
+# Apply sentiment analysis to title and body, a whole column per pass
 print("Analyzing sentiments...")
-df[['title_polarity', 'title_sentiment']] = df['title'].apply(lambda x: pd.Series(get_sentiment(x)))
-df[['body_polarity', 'body_sentiment']] = df['body'].apply(lambda x: pd.Series(get_sentiment(x)))
-
-# Combined sentiment (average of title and body)
-df['combined_polarity'] = (df['title_polarity'] + df['body_polarity']) / 2
-df['combined_sentiment'] = df[['title_sentiment', 'body_sentiment']].apply(
-    lambda x: x[0] if abs(get_sentiment(df['title'].iloc[0])[0]) > abs(get_sentiment(df['body'].iloc[0])[0]) else x[1], 
-    axis=1
+for column in ['title', 'body']:
+    polarity, _ = score_texts(df[column])
+    df[f'{column}_polarity'] = polarity
+    df[f'{column}_sentiment'] = sentiment_labels(polarity)
+
+# Combined sentiment from the title/body polarity columns
+weights = None
+if FUSION_STRATEGY == 'learned':
+    if os.path.exists(ROBERTA_LABELS):
+        labels = load_frame(ROBERTA_LABELS, columns=['title', 'roberta_sentiment', 'roberta_score'])
+        labels = df[['title']].merge(labels.drop_duplicates('title'), on='title', how='left')
+        # RoBERTa as a signed polarity: +score positive, -score negative, 0 neutral
+        sign = labels['roberta_sentiment'].astype(str).map({'positive': 1.0, 'negative': -1.0}).fillna(0.0)
+        target = (sign * labels['roberta_score'].fillna(0.0)).to_numpy()
+        known = labels['roberta_sentiment'].notna().to_numpy()
+        weights = fit_weights(df['title_polarity'].to_numpy()[known], df['body_polarity'].to_numpy()[known], target[known])
+        print(f"Learned fusion weights: title {weights[0]:.3f}, body {weights[1]:.3f} ({known.sum()} labelled posts)")
+    else:
+        print(f"⚠️  {ROBERTA_LABELS} not found, falling back to length-weighted fusion")
+        FUSION_STRATEGY = 'length_weighted'
+
+df['combined_polarity'] = fuse(
+    FUSION_STRATEGY, df['title_polarity'], df['body_polarity'],
+    title_length=df['title'].fillna('').astype(str).str.split().str.len(),
+    body_length=df['body'].fillna('').astype(str).str.split().str.len(),
+    weights=weights
 )
+df['combined_sentiment'] = sentiment_labels(df['combined_polarity'])
 
 # ===== SENTIMENT STATISTICS =====
 print("\n✅ SENTIMENT ANALYSIS COMPLETE\n")
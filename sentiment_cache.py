@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# ------------------------------
+# Persistent sentiment results, keyed by hash of (model, version, normalised text)
+# ------------------------------
+CACHE_FILE = "sentiment_cache/scores.sqlite3"
+QUERY_CHUNK = 500           # keys per SELECT ... IN (...), under SQLite's parameter limit
+
+
+def normalise_text(value):
+    """The text a scorer actually sees: None/NaN as '', unified line endings, outer whitespace dropped"""
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    return str(value).replace('\r\n', '\n').strip()
+
+
+def text_key(model, version, text):
+    return hashlib.sha1(f"{model}\0{version}\0{text}".encode('utf-8')).hexdigest()
+
+
+class SentimentCache:
+    """Content-addressed store of scorer outputs shared by every analysis script
+
+    A result is stored under the hash of the model name, its version and the
+    normalised text, so an unchanged title or body is scored once per model
+    version, whichever script asks first. Results are any JSON-serialisable value
+    (e.g. [polarity, subjectivity] or [label, score]).
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS scores (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                version TEXT,
+                result TEXT,
+                stored_at REAL
+            )
+        """)
+        self.db.commit()
+
+    def get_many(self, keys):
+        """{key: result} for the keys that are cached"""
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), QUERY_CHUNK):
+            chunk = keys[start:start + QUERY_CHUNK]
+            rows = self.db.execute(
+                f"SELECT key, result FROM scores WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update((key, json.loads(result)) for key, result in rows)
+        return found
+
+    def put_many(self, model, version, results):
+        """Store {key: result}"""
+        now = time.time()
+        self.db.executemany(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)",
+            [(key, model, version, json.dumps(result), now) for key, result in results.items()]
+        )
+        self.db.commit()
+
+    def scores(self, model, version, texts, score_batch):
+        """Results for `texts` in order; only texts never seen by this model version are scored
+
+        `score_batch` gets the list of distinct, normalised, uncached texts and returns
+        one result per text.
+        """
+        texts = [normalise_text(text) for text in texts]
+        keys = [text_key(model, version, text) for text in texts]
+        results = self.get_many(set(keys))
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in results:
+                missing.setdefault(key, text)
+        self.hits += len(keys) - sum(key in missing for key in keys)
+        self.misses += len(missing)
+        if missing:
+            scored = dict(zip(missing, score_batch(list(missing.values()))))
+            # JSON round trip, so fresh and cached results have the same types
+            scored = {key: json.loads(json.dumps(result)) for key, result in scored.items()}
+            self.put_many(model, version, scored)
+            results.update(scored)
+        return [results[key] for key in keys]
+
+    def clear(self, model=None):
+        """Drop every cached result, or only those of one model"""
+        if model is None:
+            self.db.execute("DELETE FROM scores")
+        else:
+            self.db.execute("DELETE FROM scores WHERE model = ?", (model,))
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+_cache = None
+
+
+def shared_cache():
+    """Process-wide cache on CACHE_FILE"""
+    global _cache
+    if _cache is None:
+        _cache = SentimentCache()
+    return _cache
@@ -0,0 +1,50 @@
+import numpy as np
+
+# ------------------------------
+# Title + body polarity fusion into one combined polarity per post
+# ------------------------------
+FUSION_STRATEGIES = ('mean', 'length_weighted', 'max_magnitude', 'learned')
+
+
+def max_magnitude(title_polarity, body_polarity):
+    """Whichever of title/body is more strongly opinionated; ties go to the body"""
+    return np.where(np.abs(title_polarity) > np.abs(body_polarity), title_polarity, body_polarity)
+
+
+def length_weighted(title_polarity, body_polarity, title_length, body_length):
+    """Polarities weighted by word count, so a one-line title does not outvote a long body"""
+    title_length = np.asarray(title_length, dtype=float)
+    body_length = np.asarray(body_length, dtype=float)
+    total = title_length + body_length
+    weighted = title_polarity * title_length + body_polarity * body_length
+    return np.divide(weighted, total, out=np.zeros_like(total), where=total > 0)
+
+
+def fit_weights(title_polarity, body_polarity, target):
+    """Least-squares (title, body) weights that best reproduce a reference polarity"""
+    features = np.column_stack([title_polarity, body_polarity])
+    weights, *_ = np.linalg.lstsq(features, np.asarray(target, dtype=float), rcond=None)
+    return weights
+
+
+def learned(title_polarity, body_polarity, weights):
+    return np.clip(np.column_stack([title_polarity, body_polarity]) @ weights, -1.0, 1.0)
+
+
+def fuse(strategy, title_polarity, body_polarity, title_length=None, body_length=None, weights=None):
+    """Combined polarity array for one of FUSION_STRATEGIES"""
+    title_polarity = np.asarray(title_polarity, dtype=float)
+    body_polarity = np.asarray(body_polarity, dtype=float)
+    if strategy == 'mean':
+        return (title_polarity + body_polarity) / 2
+    if strategy == 'max_magnitude':
+        return max_magnitude(title_polarity, body_polarity)
+    if strategy == 'length_weighted':
+        if title_length is None or body_length is None:
+            raise ValueError("length_weighted fusion needs title_length and body_length")
+        return length_weighted(title_polarity, body_polarity, title_length, body_length)
+    if strategy == 'learned':
+        if weights is None:
+            raise ValueError("learned fusion needs weights (see fit_weights)")
+        return learned(title_polarity, body_polarity, weights)
+    raise ValueError(f"Unknown fusion strategy {strategy!r}, expected one of {FUSION_STRATEGIES}")
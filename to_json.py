@@ -1,46 +1,313 @@
+import csv
+import glob
+import heapq
 import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+from columnar_store import require_pyarrow
+from jsonl_sink import JsonlSink, read_jsonl, read_sink, sink_parts
+from post_identity import fullname
 
 # 1. Define your file names
-file1_name = 'dhaka_extended_posts.json'
-file2_name = 'combined_dhaka_posts.json'
-output_file_name = 'final_dhaka_dataset.json'
+# Any mix of .json arrays, .jsonl(.gz/.zst) files, crawler sink bases and .csv exports;
+# `python to_json.py OUTPUT INPUT...` overrides both settings
+input_files = ['dhaka_extended_posts.json', 'combined_dhaka_posts.json']
+output_file_name = 'final_dhaka_dataset.json'      # .json, .jsonl or .parquet
 
-def load_json(filename):
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
+RUN_RECORDS = 50000         # records sorted in memory before spilling a run to disk
+PARQUET_BATCH = 10000
+COUNT_FIELDS = ('upvotes', 'comments')
+
+
+def iter_json_array(path, chunk_size=1024 * 1024):
+    """Yield the elements of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = f.read(chunk_size).lstrip()
+        if not buf.startswith('['):
+            raise ValueError(f"{path} is not a JSON array")
+        pos = 1
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) and buf[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                more = f.read(chunk_size)
+                if not more:
+                    raise
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+            yield item
+            pos = end
+            if pos > chunk_size:
+                buf = buf[pos:]
+                pos = 0
+
+
+def iter_csv(path):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            for field in COUNT_FIELDS:
+                if row.get(field, '') != '':
+                    row[field] = int(float(row[field]))
+            yield row
+
+
+def sink_base(filename):
+    """Crawlers stream to JSONL parts (name-0000.jsonl, ...) instead of name.json / name.jsonl"""
+    for ext in ('.jsonl', '.json'):
+        if filename.endswith(ext):
+            return filename[:-len(ext)]
+    return filename
+
+
+def iter_posts(filename):
+    """Stream the posts of one input, whatever its format"""
+    base = sink_base(filename)
+    if sink_parts(base):
+        return read_sink(base)
+    if not os.path.exists(filename):
         print(f"Error: {filename} not found.")
-        return []
-
-# 2. Load the data
-print("Loading datasets...")
-data1 = load_json(file1_name)
-data2 = load_json(file2_name)
-
-# 3. Combine the lists
-combined_raw = data1 + data2
-print(f"Total posts loaded: {len(combined_raw)}")
-
-# 4. Remove duplicates based on 'url'
-# We use a dictionary because keys must be unique. 
-# If a URL repeats, the new post will just overwrite the old one, automatically removing duplicates.
-unique_posts_dict = {}
-
-for post in combined_raw:
-    if 'url' in post:
-        unique_posts_dict[post['url']] = post
-
-# Convert back to a list
-final_clean_data = list(unique_posts_dict.values())
-
-# 5. Save the clean data
-with open(output_file_name, 'w', encoding='utf-8') as f:
-    json.dump(final_clean_data, f, indent=4, ensure_ascii=False)
-
-# 6. Print stats
-duplicates_removed = len(combined_raw) - len(final_clean_data)
-print("-" * 30)
-print(f"Successfully saved to: {output_file_name}")
-print(f"Final unique post count: {len(final_clean_data)}")
-print(f"Duplicates removed: {duplicates_removed}")
\ No newline at end of file
+        return iter(())
+    if filename.endswith('.csv'):
+        return iter_csv(filename)
+    if '.jsonl' in filename:
+        return read_jsonl(filename)
+    return iter_json_array(filename)
+
+
+def snapshot_time(filename):
+    """When an input was captured: its newest part / file modification time"""
+    paths = sink_parts(sink_base(filename)) or [filename]
+    return max((os.path.getmtime(p) for p in paths if os.path.exists(p)), default=0)
+
+
+def canonical_id(post):
+    """Reddit fullname (t3_...) when the record carries a post id, the url otherwise"""
+    name = fullname(post)
+    if name:
+        return name
+    return f"url:{post.get('url')}" if post.get('url') else None
+
+
+def spill(entries, run_dir, prefix):
+    """Sort bounded batches of [sort fields..., post] entries into run files on disk"""
+    runs = []
+    batch = []
+
+    def flush():
+        if not batch:
+            return
+        batch.sort(key=lambda entry: entry[:-1])
+        path = os.path.join(run_dir, f"{prefix}-{len(runs):05d}.jsonl")
+        with open(path, 'w', encoding='utf-8') as f:
+            for entry in batch:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        runs.append(path)
+        batch.clear()
+
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= RUN_RECORDS:
+            flush()
+    flush()
+    return runs
+
+
+def _read_run(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def merge_sorted(runs):
+    return heapq.merge(*(_read_run(path) for path in runs), key=lambda entry: entry[:-1])
+
+
+def created_time(post):
+    """Epoch seconds from created_utc or the 'YYYY-mm-dd HH:MM:SS' date; 0 when unknown"""
+    if isinstance(post.get('created_utc'), (int, float)):
+        return float(post['created_utc'])
+    try:
+        return datetime.strptime(str(post.get('date'))[:19], '%Y-%m-%d %H:%M:%S').timestamp()
+    except ValueError:
+        return 0.0
+
+
+def url_entries(inputs, stats):
+    """[url, has no id, newest-created first, id, newest-first rank, post] for every input record"""
+    for index, filename in enumerate(inputs):
+        captured = snapshot_time(filename)
+        for seq, post in enumerate(iter_posts(filename)):
+            key = canonical_id(post)
+            if key is None:
+                stats['skipped'] += 1
+                continue
+            stats['loaded'] += 1
+            # Newest snapshot first; a later input or later line wins a tie
+            yield [post.get('url') or '', not key.startswith('t3_'), -created_time(post), key,
+                   [-captured, -index, -seq], post]
+
+
+def link_by_url(entries, stats):
+    """[id, rank, post] with id-less records moved onto the id of a post with the same url
+
+    Entries arrive in url order with the id'd records of each url first, most
+    recently created first, so an id-less copy (e.g. from combined_dhaka_posts.json)
+    joins the newest id'd post sharing its url instead of surviving as a duplicate
+    under url:<url>.
+    """
+    current_url = None
+    linked_key = None
+    for url, no_id, _, key, rank, post in entries:
+        if url != current_url:
+            current_url = url
+            linked_key = None
+        if not no_id:
+            if linked_key is None:
+                linked_key = key
+        elif linked_key is not None and url:
+            key = linked_key
+            stats['linked'] += 1
+        yield [key, rank, post]
+
+
+def spill_runs(inputs, run_dir):
+    """Sort every record by url, link id-less ones to their id'd copy, then sort by id"""
+    stats = {'loaded': 0, 'skipped': 0, 'linked': 0}
+    url_runs = spill(url_entries(inputs, stats), run_dir, 'url')
+    runs = spill(link_by_url(merge_sorted(url_runs), stats), run_dir, 'id')
+    for path in url_runs:
+        os.remove(path)
+    return runs, stats
+
+
+def merge_runs(runs):
+    """k-way merge of the sorted runs; yields one merged post per id, in id order
+
+    The newest snapshot supplies upvotes/comments and every other field it has;
+    fields it lacks (e.g. permalink) are filled in from older snapshots.
+    """
+    merged = merge_sorted(runs)
+    current_key = None
+    current = None
+    for key, rank, post in merged:
+        if key != current_key:
+            if current is not None:
+                yield current
+            current_key = key
+            current = dict(post)
+            if key.startswith('t3_'):
+                current['fullname'] = key
+        else:
+            for field, value in post.items():
+                if current.get(field) in (None, '') and field not in COUNT_FIELDS:
+                    current[field] = value
+    if current is not None:
+        yield current
+
+
+class JsonArrayWriter:
+    """Streams a JSON array, one post per line (no indent=4 blow-up)"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write('[')
+        self.count = 0
+
+    def write(self, post):
+        self.file.write(('\n' if self.count == 0 else ',\n') + json.dumps(post, ensure_ascii=False))
+        self.count += 1
+
+    def close(self):
+        self.file.write('\n]\n')
+        self.file.close()
+
+
+class ParquetBatchWriter:
+    """Writes posts to Parquet in fixed-size row groups"""
+
+    def __init__(self, path):
+        pa = require_pyarrow()
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.schema = pa.schema([
+            ('title', pa.string()), ('body', pa.string()), ('url', pa.string()), ('author', pa.string()),
+            ('upvotes', pa.int64()), ('comments', pa.int64()), ('date', pa.timestamp('s')),
+            ('subreddit', pa.dictionary(pa.int32(), pa.string())), ('permalink', pa.string())
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+        self.rows = []
+
+    def write(self, post):
+        row = {name: post.get(name) for name in self.schema.names}
+        if isinstance(row['date'], str):
+            row['date'] = datetime.strptime(row['date'][:19], '%Y-%m-%d %H:%M:%S') if row['date'] else None
+        self.rows.append(row)
+        if len(self.rows) >= PARQUET_BATCH:
+            self._flush()
+
+    def _flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+def open_writer(output_file):
+    """(writer, path it writes to); single-file outputs go to a temp name swapped in at the end"""
+    if output_file.endswith('.jsonl'):
+        return JsonlSink(sink_base(output_file)), None
+    tmp_path = output_file + '.tmp'
+    if output_file.endswith('.parquet'):
+        return ParquetBatchWriter(tmp_path), tmp_path
+    return JsonArrayWriter(tmp_path), tmp_path
+
+
+def merge_datasets(inputs, output_file):
+    """Merge any number of crawl outputs into one deduplicated, id-sorted dataset"""
+    with tempfile.TemporaryDirectory(prefix='merge-') as run_dir:
+        runs, stats = spill_runs(inputs, run_dir)
+        # The output may also be one of the inputs; they are fully spilled by now
+        writer, tmp_path = open_writer(output_file)
+        written = 0
+        for post in merge_runs(runs):
+            writer.write(post)
+            written += 1
+        writer.close()
+        if tmp_path is not None:
+            os.replace(tmp_path, output_file)
+    stats['written'] = written
+    stats['runs'] = len(runs)
+    return stats
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        output_file_name = sys.argv[1]
+        input_files = [path for pattern in sys.argv[2:] for path in (glob.glob(pattern) or [pattern])]
+
+    # 2. Stream, sort and merge the data
+    print("Merging datasets...")
+    stats = merge_datasets(input_files, output_file_name)
+
+    # 3. Print stats
+    print("-" * 30)
+    print(f"Successfully saved to: {output_file_name}")
+    print(f"Total posts loaded: {stats['loaded']} from {len(input_files)} inputs ({stats['runs']} sorted runs)")
+    print(f"Final unique post count: {stats['written']}")
+    print(f"Duplicates removed: {stats['loaded'] - stats['written']}")
+    if stats['linked']:
+        print(f"Posts without an id matched to a post with the same url: {stats['linked']}")
+    if stats['skipped']:
+        print(f"Posts without an id or url skipped: {stats['skipped']}")
@@ -3,13 +3,17 @@ import numpy as np
 from collections import Counter
 import re
 
+from columnar_store import load_frame
+
 print("=" * 100)
 print("WHAT ARE DHAKA PEOPLE TALKING ABOUT? - COMPREHENSIVE ANALYSIS")
 print("=" * 100)
 print()
 
 # Load data
-df = pd.read_csv("advanced_sentiment_analysis/05_posts_with_advanced_analysis.csv")
+# Only the columns this report uses are decoded from the Parquet copy
+df = load_frame("advanced_sentiment_analysis/05_posts_with_advanced_analysis.csv",
+                columns=['title', 'upvotes', 'polarity', 'sentiment', 'topics'])
 
 print("📊 DATASET OVERVIEW")
 print("-" * 100)